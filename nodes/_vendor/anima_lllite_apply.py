@@ -12,7 +12,8 @@
 
 ``apply_anima_lllite`` mirrors ``AnimaLLLiteApply.apply``: it loads an LLLite
 weights file, builds the matching ``ControlNetLLLiteDiT`` from the trained
-metadata, and installs a model_function_wrapper (scoped to a model clone) that
+metadata (reusing a cached build for the same file and model, see
+``get_anima_lllite``), and installs a model_function_wrapper (scoped to a model clone) that
 feeds the given control image into the LLLite modules over a sampling-progress
 window. Returns the patched MODEL.
 """
@@ -20,6 +21,8 @@ from __future__ import annotations
 
 import logging
 import os
+import weakref
+from collections import OrderedDict
 from typing import Optional
 
 import torch
@@ -29,6 +32,7 @@ from .control_net_lllite_anima import (
     ASPP_DEFAULT_DILATIONS,
     ControlNetLLLiteDiT,
     load_lllite_weights,
+    load_lllite_weights_open,
     read_lllite_metadata,
 )
 
@@ -61,14 +65,16 @@ def _target_cond_hw(latent_h: int, latent_w: int, patch_spatial: int = 2) -> tup
 
 def _prepare_cond_image(image: torch.Tensor, latent_h: int, latent_w: int,
                         device: torch.device, dtype: torch.dtype,
-                        patch_spatial: int = 2) -> torch.Tensor:
-    """ComfyUI IMAGE (B,H,W,3) in [0,1] → (1,3,H*8,W*8) in [-1,1]."""
+                        patch_spatial: int = 2, all_frames: bool = False) -> torch.Tensor:
+    """ComfyUI IMAGE (B,H,W,3) in [0,1] → (1,3,H*8,W*8) in [-1,1]
+    (``(B,3,H*8,W*8)`` with ``all_frames``, one cond per batch element)."""
     if image.ndim == 4 and image.shape[-1] == 3:
         img = image.permute(0, 3, 1, 2).contiguous()
     else:
         raise ValueError(f"Unexpected cond image shape: {tuple(image.shape)} (expected B,H,W,3)")
 
-    img = img[:1]  # use first frame only
+    if not all_frames:
+        img = img[:1]  # use first frame only
     target_h, target_w = _target_cond_hw(latent_h, latent_w, patch_spatial)
     if img.shape[-2] != target_h or img.shape[-1] != target_w:
         img = F.interpolate(img, size=(target_h, target_w), mode="bicubic", align_corners=False)
@@ -79,8 +85,9 @@ def _prepare_cond_image(image: torch.Tensor, latent_h: int, latent_w: int,
 
 def _prepare_mask(mask: torch.Tensor, latent_h: int, latent_w: int,
                   device: torch.device, dtype: torch.dtype,
-                  patch_spatial: int = 2) -> torch.Tensor:
-    """ComfyUI MASK (B,H,W) in [0,1] → (1,1,H*8,W*8) binarized at 0.5."""
+                  patch_spatial: int = 2, all_frames: bool = False) -> torch.Tensor:
+    """ComfyUI MASK (B,H,W) in [0,1] → (1,1,H*8,W*8) binarized at 0.5
+    (``(B,1,H*8,W*8)`` with ``all_frames``)."""
     if mask.ndim == 3:
         m = mask.unsqueeze(1)
     elif mask.ndim == 4 and mask.shape[1] == 1:
@@ -88,7 +95,8 @@ def _prepare_mask(mask: torch.Tensor, latent_h: int, latent_w: int,
     else:
         raise ValueError(f"Unexpected mask shape: {tuple(mask.shape)} (expected B,H,W or B,1,H,W)")
 
-    m = m[:1]
+    if not all_frames:
+        m = m[:1]
     target_h, target_w = _target_cond_hw(latent_h, latent_w, patch_spatial)
     if m.shape[-2] != target_h or m.shape[-1] != target_w:
         m = F.interpolate(m.float(), size=(target_h, target_w), mode="nearest")
@@ -121,7 +129,70 @@ def build_anima_lllite(model, weights_path: str, strength: float):
     if weights_path is None or not os.path.isfile(weights_path):
         raise FileNotFoundError(f"LLLite weights not found: {weights_path}")
 
+    if os.path.splitext(weights_path)[1] == ".safetensors":
+        return _build_anima_lllite_direct(model, weights_path, strength)
+
     meta = read_lllite_metadata(weights_path)
+    lllite, patch_spatial, cond_in_channels, inpaint_masked_input = _construct_anima_lllite(
+        model, meta, strength
+    )
+    load_lllite_weights(lllite, weights_path, strict=False)
+    lllite.eval().requires_grad_(False)
+    return lllite, patch_spatial, cond_in_channels, inpaint_masked_input
+
+
+def _offload_device() -> torch.device:
+    """Where LLLite networks rest between sampling runs: ComfyUI's UNet offload
+    device (system RAM unless ComfyUI keeps everything on the GPU)."""
+    try:
+        import comfy.model_management as mm
+        return torch.device(mm.unet_offload_device())
+    except ImportError:
+        return torch.device("cpu")
+
+
+def offload_lllite(lllite: ControlNetLLLiteDiT):
+    """Release ``lllite``'s cond and move it to the offload device."""
+    lllite.offload(_offload_device())
+
+
+def _build_anima_lllite_direct(model, weights_path: str, strength: float):
+    """``build_anima_lllite`` for ``.safetensors``: one ``safe_open`` pass reads
+    the metadata and every tensor straight onto the offload device the network
+    rests on between runs, into a network constructed on the ``meta`` device
+    (no throwaway initial weights, no intermediate state dict). Files that
+    leave parameters unset fall back to the regular CPU build, which keeps
+    their init values."""
+    from safetensors import safe_open
+
+    device = _offload_device()
+    if device.type not in ("cpu", "cuda", "mps"):
+        # safetensors can only materialize on these; others load via the CPU.
+        device = torch.device("cpu")
+
+    with safe_open(weights_path, framework="pt", device=str(device)) as f:
+        meta = f.metadata() or {}
+        with torch.device("meta"):
+            lllite, patch_spatial, cond_in_channels, inpaint_masked_input = _construct_anima_lllite(
+                model, meta, strength
+            )
+        # float32 like a regular build, so the sampler's .to() is usually a no-op.
+        missing = load_lllite_weights_open(lllite, f, weights_path, dtype=torch.float32)
+
+    if missing:
+        logger.info("LLLite weights '%s' leave %d parameter(s) unset; building on CPU instead.",
+                    os.path.basename(weights_path), len(missing))
+        lllite, patch_spatial, cond_in_channels, inpaint_masked_input = _construct_anima_lllite(
+            model, meta, strength
+        )
+        load_lllite_weights(lllite, weights_path, strict=False)
+    lllite.eval().requires_grad_(False)
+    return lllite, patch_spatial, cond_in_channels, inpaint_masked_input
+
+
+def _construct_anima_lllite(model, meta: dict, strength: float):
+    """An unloaded ``ControlNetLLLiteDiT`` configured from the weights'
+    metadata; returns the same tuple as ``build_anima_lllite``."""
     ce_dim = int(meta.get("lllite.cond_emb_dim", 32))
     m_dim = int(meta.get("lllite.mlp_dim", 64))
     tl = meta.get("lllite.target_atomics", meta.get("lllite.target_layers", "self_attn_q"))
@@ -151,24 +222,139 @@ def build_anima_lllite(model, weights_path: str, strength: float):
         cond_in_channels=cond_in_channels,
         inpaint_masked_input=inpaint_masked_input,
     )
-    load_lllite_weights(lllite, weights_path, strict=False)
-    lllite.eval().requires_grad_(False)
     return lllite, patch_spatial, cond_in_channels, inpaint_masked_input
 
 
+# --- built-LLLite cache ------------------------------------------------------
+
+# Built + loaded LLLite networks, least recently used first. Keyed by
+# (weights path, file mtime, id(DiT), model dtype); each entry holds the DiT by
+# weakref, so the entry is dropped as soon as ComfyUI frees that model and a
+# new model reusing the address can never hit a stale network. Cached networks
+# rest on the offload device; ``install_lllite_patch`` only keeps them on the
+# sampling device for the duration of a run.
+_LLLITE_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_LLLITE_CACHE_SIZE = 4
+_unload_hooked = False
+
+
+def clear_lllite_cache():
+    """Drop every cached LLLite network."""
+    _LLLITE_CACHE.clear()
+
+
+def _hook_model_unload():
+    """Clear the cache whenever ComfyUI unloads all models (e.g. the "Free
+    model and node cache" button), so cached networks never outlive them."""
+    global _unload_hooked
+    if _unload_hooked:
+        return
+    _unload_hooked = True
+    try:
+        import comfy.model_management as mm
+    except ImportError:
+        return
+
+    original_unload_all_models = mm.unload_all_models
+
+    def unload_all_models(*args, **kwargs):
+        clear_lllite_cache()
+        return original_unload_all_models(*args, **kwargs)
+
+    mm.unload_all_models = unload_all_models
+
+
+def get_anima_lllite(model, weights_path: str, strength: float):
+    """Cached ``build_anima_lllite``: same return value, but a network already
+    built for this weights file and model is reused instead of walking the
+    DiT and reloading the weights again. Tiles and repeated runs share one
+    instance; callers set the multiplier and cond on every use anyway.
+    """
+    if weights_path is None or not os.path.isfile(weights_path):
+        raise FileNotFoundError(f"LLLite weights not found: {weights_path}")
+    _hook_model_unload()
+
+    path = os.path.realpath(weights_path)
+    dit = _get_inner_dit(model)
+    get_dtype = getattr(model.model, "get_dtype", None)
+    key = (path, os.stat(path).st_mtime_ns, id(dit), get_dtype() if get_dtype else None)
+
+    entry = _LLLITE_CACHE.get(key)
+    if entry is not None and entry[0]() is dit:
+        _LLLITE_CACHE.move_to_end(key)
+        built = entry[1]
+        built[0].release_cond()
+        built[0].set_multiplier(strength)
+        return built
+
+    built = build_anima_lllite(model, weights_path, strength)
+    offload_lllite(built[0])
+    _LLLITE_CACHE[key] = (weakref.ref(dit, lambda _, key=key: _LLLITE_CACHE.pop(key, None)), built)
+    while len(_LLLITE_CACHE) > _LLLITE_CACHE_SIZE:
+        _LLLITE_CACHE.popitem(last=False)
+    return built
+
+
+def _has_patcher_wrappers(model) -> bool:
+    """Whether this ComfyUI supports ``OUTER_SAMPLE`` patcher wrappers."""
+    try:
+        import comfy.patcher_extension  # noqa: F401
+    except ImportError:
+        return False
+    return hasattr(model, "add_wrapper_with_key")
+
+
+def install_lllite_patch(model, lllite) -> bool:
+    """Install ``lllite`` into the DiT once per sampling run of ``model``.
+
+    Registers an ``OUTER_SAMPLE`` wrapper on the (cloned) ``model`` that
+    patches the targeted Linears when sampling starts and, in a ``finally``
+    when it ends (however it ends), restores them and moves the network back
+    to the offload device. Per model call the caller then only ``place``s the
+    network and switches it on/off with ``set_cond_emb`` instead of swapping
+    every ``forward`` twice. Returns ``False`` on ComfyUI versions without
+    patcher wrappers; the caller must then ``apply_to``/``restore`` per call
+    and offload the network itself.
+    """
+    if not _has_patcher_wrappers(model):
+        return False
+    import comfy.patcher_extension as patcher_extension
+
+    def outer_sample(executor, *args, **kwargs):
+        lllite.clear_cond_image()
+        lllite.apply_to()
+        try:
+            return executor(*args, **kwargs)
+        finally:
+            lllite.restore()
+            offload_lllite(lllite)
+
+    model.add_wrapper_with_key(patcher_extension.WrappersMP.OUTER_SAMPLE,
+                               "vslinx_anima_lllite", outer_sample)
+    return True
+
+
 def apply_anima_lllite(model, weights_path: str, image: torch.Tensor, strength: float,
                        start_percent: float, end_percent: float,
-                       preserve_wrapper: bool = True, mask: Optional[torch.Tensor] = None):
+                       preserve_wrapper: bool = True, mask: Optional[torch.Tensor] = None,
+                       per_sample: bool = False):
     """Patch ``model`` with Anima ControlNet-LLLite and return the patched clone.
 
     ``weights_path`` is the resolved path to the LLLite ``.safetensors`` file.
+    With ``per_sample`` every image of the ``image`` (and ``mask``) batch is
+    the control for the matching latent batch element, instead of the first
+    image controlling all of them; the latent batch must then have the same
+    size as ``image``.
     """
     if weights_path is None or not os.path.isfile(weights_path):
         raise FileNotFoundError(f"LLLite weights not found: {weights_path}")
 
     # Architecture is fully determined by the trained weights — read everything
     # from metadata rather than exposing knobs that would just cause load errors.
-    lllite, patch_spatial, cond_in_channels, inpaint_masked_input = build_anima_lllite(
+    # Without patcher wrappers nothing would move a cached network off the
+    # sampling device after a run, so build a private one as before.
+    build = get_anima_lllite if _has_patcher_wrappers(model) else build_anima_lllite
+    lllite, patch_spatial, cond_in_channels, inpaint_masked_input = build(
         model, weights_path, strength
     )
 
@@ -194,7 +380,7 @@ def apply_anima_lllite(model, weights_path: str, image: torch.Tensor, strength:
     src_mask = mask.detach().clone() if mask is not None else None
     is_inpaint = cond_in_channels == 4
 
-    cache = {"cond_image_pp": None, "key": None, "lllite_loaded_to": None}
+    cache = {"cond_emb": None, "key": None}
 
     # Capture any previously-installed wrapper BEFORE cloning so a second
     # wrapper-installing node doesn't silently no-op the first.
@@ -218,31 +404,37 @@ def apply_anima_lllite(model, weights_path: str, image: torch.Tensor, strength:
         device = input_x.device
         dtype = input_x.dtype
 
-        tag = (device, dtype)
-        if cache["lllite_loaded_to"] != tag:
-            lllite.to(device=device, dtype=dtype)
-            cache["lllite_loaded_to"] = tag
-            cache["cond_image_pp"] = None
+        # Back on the sampling device after the previous run's offload.
+        if lllite.place(device, dtype):
+            cache["cond_emb"] = None
 
+        # The cond image never changes during a run: embed it once per latent
+        # size/device/dtype instead of re-running the conditioning trunk per call.
         key = (latent_h, latent_w, device, dtype)
-        if cache["key"] != key or cache["cond_image_pp"] is None:
-            rgb = _prepare_cond_image(src_image, latent_h, latent_w, device, dtype, patch_spatial)
+        if cache["key"] != key or cache["cond_emb"] is None:
+            rgb = _prepare_cond_image(src_image, latent_h, latent_w, device, dtype, patch_spatial,
+                                      all_frames=per_sample)
             if is_inpaint:
-                mk = _prepare_mask(src_mask, latent_h, latent_w, device, dtype, patch_spatial)
-                cache["cond_image_pp"] = _build_inpaint_cond_image(rgb, mk, inpaint_masked_input)
+                mk = _prepare_mask(src_mask, latent_h, latent_w, device, dtype, patch_spatial,
+                                   all_frames=per_sample)
+                cond_image_pp = _build_inpaint_cond_image(rgb, mk, inpaint_masked_input)
             else:
-                cache["cond_image_pp"] = rgb
+                cond_image_pp = rgb
+            cache["cond_emb"] = lllite.encode_cond_image(cond_image_pp)
             cache["key"] = key
 
         lllite.set_multiplier(strength)
-        lllite.set_cond_image(cache["cond_image_pp"])
-        lllite.apply_to()
+        lllite.set_cond_emb(cache["cond_emb"])
+        if not persistent:
+            lllite.apply_to()
         try:
             return _call_next(apply_model, input_x, timestep, c)
         finally:
-            lllite.restore()
+            if not persistent:
+                lllite.restore()
             lllite.clear_cond_image()
 
     m = model.clone()
     m.set_model_unet_function_wrapper(wrapper)
+    persistent = install_lllite_patch(m, lllite)
     return m
@@ -1,8 +1,9 @@
 # ---------------------------------------------------------------------------
 # VENDORED from kohya-ss/ComfyUI-Anima-LLLite (Apache License 2.0).
 # Source: https://github.com/kohya-ss/ComfyUI-Anima-LLLite
-# Copied verbatim except for this banner so the vsLinx "Anima LLLite Tiled
-# ControlNet Sampler" node can run without requiring that pack to be installed.
+# Copied so the vsLinx "Anima LLLite Tiled ControlNet Sampler" node can run
+# without requiring that pack to be installed; the vsLinx performance changes
+# are listed with the other differences in the module docstring.
 # The Apache 2.0 license text is kept alongside this file as
 # `LICENSE-Anima-LLLite`. See the README "Credits" section.
 # ---------------------------------------------------------------------------
@@ -19,8 +20,9 @@ Differences vs. the sd-scripts reference (``networks/control_net_lllite_anima.py
     addition to the path-based check (ComfyUI ships two distinct ``Attention``
     classes that share the bare class name).
   * ``LLLiteModuleDiT`` keeps a ``restore()`` method (and an idempotent
-    ``apply_to()``); ComfyUI patches/unpatches the original Linear around
-    every sampler call via ``set_model_unet_function_wrapper``.
+    ``apply_to()``). The modules are installed once per sampling run and
+    switched on/off per model call through a shared gate (``set_cond_emb``);
+    see ``anima_lllite_apply.install_lllite_patch``.
   * Forward pass casts ``x`` and ``cond_emb`` to the LLLite parameter dtype
     so autocast / mixed-precision flows that hand us a different dtype than
     the LLLite weights still work.
@@ -28,11 +30,22 @@ Differences vs. the sd-scripts reference (``networks/control_net_lllite_anima.py
     instead of asserting, so a slightly-off cond image cannot abort sampling.
   * The training-side ``AnimaControlNetLLLiteWrapper`` is omitted; ComfyUI
     integrates via ``model_function_wrapper`` in nodes.py instead.
+  * ``encode_cond_image`` / ``set_cond_emb`` split ``set_cond_image`` so a
+    cond embedding can be computed once and reused across sampling steps.
+  * ``load_lllite_weights_open`` loads from a single ``safe_open`` pass
+    straight into a (meta-constructed) network on the target device.
+  * Target discovery is a module-level ``find_lllite_targets`` whose result
+    is cached per DiT object and atomic target set.
+  * Inference fast path: ``LLLiteModuleDiT.set_cond`` precomputes the FiLM
+    terms and the cond half of ``mid`` once per cond embedding, so the forward
+    only runs the x-dependent matmuls (no per-call concat). CFG batches
+    broadcast the cond terms over a view instead of ``repeat``-ing them.
 """
 from __future__ import annotations
 
 import logging
 import os
+import weakref
 from typing import List, Optional, Tuple
 
 import torch
@@ -204,6 +217,19 @@ class _Conditioning1(nn.Module):
 # LLLite module (v2: FiLM + SiLU + 5D path + depth embedding)
 # ----------------------------------------------------------------------------
 
+class _LLLiteGate:
+    """On/off switch shared by every module of one ``ControlNetLLLiteDiT``.
+
+    With persistent patching the modules stay installed for a whole sampling
+    run; turning the network on or off per model call is then a single
+    attribute write here instead of one ``forward`` swap per patched Linear.
+    """
+    __slots__ = ("active",)
+
+    def __init__(self):
+        self.active = True
+
+
 class LLLiteModuleDiT(nn.Module):
     def __init__(
         self,
@@ -240,6 +266,16 @@ class LLLiteModuleDiT(nn.Module):
 
         self.cond_emb: Optional[torch.Tensor] = None
         self.org_forward = None
+        # Replaced by the parent's shared gate after construction.
+        self._gate = _LLLiteGate()
+        # Inference fast path (see ``set_cond``): the x-independent projections
+        # of the current cond embedding, and the embedding they were computed
+        # from. ``_films`` keeps them per embedding (by id, checked against a
+        # weakref) so alternating conds, e.g. MultiDiffusion tile groups, are
+        # only projected once; an entry goes away with its embedding.
+        self._film: Optional[Tuple[torch.Tensor, ...]] = None
+        self._film_src: Optional[torch.Tensor] = None
+        self._films: dict = {}
 
         # Set by the parent ControlNetLLLiteDiT after construction.
         self.layer_idx: int = -1
@@ -255,12 +291,45 @@ class LLLiteModuleDiT(nn.Module):
             self.org_module[0].forward = self.org_forward
             self.org_forward = None
 
+    def set_cond(self, cond_emb: Optional[torch.Tensor]):
+        """Set the cond embedding and precompute everything that depends only
+        on it: the FiLM ``1 + gamma`` / ``beta`` and the cond half of ``mid``
+        (``mid`` is split into its cond and hidden columns). The forward then
+        only runs the x-dependent matmuls. ``None`` disables the module but
+        keeps the projections, and every embedding's projections are kept
+        while it is alive, so re-setting a known embedding is free.
+        """
+        self.cond_emb = cond_emb
+        if cond_emb is None or self.training:
+            return
+        weight = self.mid.weight
+        key = id(cond_emb)
+        entry = self._films.get(key)
+        if entry is not None and entry[0]() is cond_emb:
+            film = entry[1]
+            if film[0].device == weight.device and film[0].dtype == weight.dtype:
+                self._film = film
+                self._film_src = cond_emb
+                return
+
+        cx = cond_emb.to(device=weight.device, dtype=weight.dtype)
+        if self._depth_embeds_ref:
+            cx = cx + self._depth_embeds_ref[0][self.layer_idx].to(device=weight.device, dtype=weight.dtype)
+        with torch.no_grad():
+            gamma, beta = self.cond_to_film(cx).chunk(2, dim=-1)
+            cond_mid = F.linear(cx, weight[:, :self.cond_emb_dim], self.mid.bias)
+            mid_h = weight[:, self.cond_emb_dim:].contiguous()
+        self._film = (cond_mid, 1 + gamma, beta, mid_h)
+        self._film_src = cond_emb
+        films = self._films
+        self._films[key] = (weakref.ref(cond_emb, lambda _, key=key: films.pop(key, None)), self._film)
+
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         # Input layouts:
         #   self/cross attention q/k/v: (B, S, D) — already flattened in the Anima block
         #   mlp.layer1:                 (B, T, H, W, D) — passed un-flattened
         # Flatten the 5D case to 3D for the LLLite path and reshape on exit.
-        if self.multiplier == 0.0 or self.cond_emb is None:
+        if not self._gate.active or self.multiplier == 0.0 or self.cond_emb is None:
             return self.org_forward(x)
 
         orig_shape = x.shape
@@ -269,6 +338,24 @@ class LLLiteModuleDiT(nn.Module):
             B, T, H, W, D = orig_shape
             x = x.reshape(B, T * H * W, D)
 
+        film = self._film
+        if (film is not None and self._film_src is self.cond_emb and not self.training
+                and film[3].dtype == self.down.weight.dtype):
+            # Fast path: the cond-only projections were precomputed by set_cond.
+            cond_mid, scale, beta, mid_h = film
+            if x.shape[0] % cond_mid.shape[0] != 0 or x.shape[1] != cond_mid.shape[1]:
+                return self.org_forward(x.reshape(orig_shape) if is_5d else x)
+            x_proc = x if x.dtype == mid_h.dtype else x.to(mid_h.dtype)
+            h = F.silu(self.down(x_proc))
+            m = F.linear(h, mid_h)
+            if x.shape[0] != cond_mid.shape[0]:
+                # CFG / multi-cond batch: view it as (repeats, B_c, ...) so the
+                # cond terms broadcast instead of being copied per repeat.
+                m = m.view(-1, *cond_mid.shape)
+            # Fresh buffer from the matmul: apply the FiLM terms in place.
+            m = F.silu(m.add_(cond_mid).mul_(scale).add_(beta), inplace=True)
+            return self._finish(x, self.up(m.view(h.shape[0], h.shape[1], -1)), orig_shape, is_5d)
+
         cx = self.cond_emb  # (B_c, S, cond_emb_dim)
 
         # Broadcast cond_emb to the runtime batch (CFG cond+uncond, multi-cond).
@@ -309,7 +396,11 @@ class LLLiteModuleDiT(nn.Module):
         if self.dropout is not None and self.training:
             m = F.dropout(m, p=self.dropout)
 
-        out = self.up(m) * self.multiplier
+        return self._finish(x, self.up(m), orig_shape, is_5d)
+
+    def _finish(self, x: torch.Tensor, up: torch.Tensor, orig_shape, is_5d: bool) -> torch.Tensor:
+        """Add the scaled LLLite correction to ``x`` and run the original Linear."""
+        out = up * self.multiplier
         if out.dtype != x.dtype:
             out = out.to(x.dtype)
 
@@ -321,6 +412,75 @@ class LLLiteModuleDiT(nn.Module):
         return y
 
 
+# ----------------------------------------------------------------------------
+# Target discovery (cached per DiT)
+# ----------------------------------------------------------------------------
+
+# DiT -> {atomics: [(lllite_name, Linear), ...]}. Weakly keyed, so an entry
+# goes away with its model; the values only reference the DiT's Linears.
+_TARGET_INDEX: "weakref.WeakKeyDictionary[nn.Module, dict]" = weakref.WeakKeyDictionary()
+
+
+def _attn_atomic_match(is_self_attn: bool, child_name: str, atomics: Tuple[str, ...]) -> bool:
+    if "output_proj" in child_name:
+        return False
+    if is_self_attn:
+        if child_name == "q_proj":
+            return "self_attn_q_pre" in atomics
+        if child_name in ("k_proj", "v_proj"):
+            return "self_attn_kv_pre" in atomics
+        return False
+    else:
+        if child_name == "q_proj":
+            return "cross_attn_q_pre" in atomics
+        return False  # cross_attn K,V live in text-embedding space
+
+
+def find_lllite_targets(dit: nn.Module, atomics: Tuple[str, ...]) -> List[Tuple[str, nn.Linear]]:
+    """The ``(lllite_name, Linear)`` pairs LLLite patches in ``dit`` for the
+    given atomic target set, in module order.
+
+    Walking every ``named_modules`` entry of a large DiT is a noticeable cost,
+    so the result is indexed by the DiT object and the atomic set and reused
+    by every later network built against the same model.
+    """
+    per_dit = _TARGET_INDEX.setdefault(dit, {})
+    targets = per_dit.get(atomics)
+    if targets is not None:
+        return targets
+
+    targets = []
+    want_mlp_fc1 = "mlp_fc1_pre" in atomics
+    any_attn = any(a in atomics for a in ("self_attn_q_pre", "self_attn_kv_pre", "cross_attn_q_pre"))
+
+    for name, module in dit.named_modules():
+        if LLM_ADAPTER_NAME in name:
+            continue
+        cls = module.__class__.__name__
+
+        if any_attn and cls == TARGET_ATTENTION_CLASS:
+            # The Anima-block Attention exposes is_selfattn; the LLM-Adapter
+            # Attention does not — skip the latter even if path filter misses.
+            if not hasattr(module, "is_selfattn"):
+                continue
+            is_self_attn = bool(module.is_selfattn)
+            for child_name, child in module.named_children():
+                if not isinstance(child, nn.Linear):
+                    continue
+                if not _attn_atomic_match(is_self_attn, child_name, atomics):
+                    continue
+                targets.append((f"lllite_dit.{name}.{child_name}".replace(".", "_"), child))
+
+        elif want_mlp_fc1 and cls == TARGET_MLP_CLASS:
+            child = getattr(module, "layer1", None)
+            if not isinstance(child, nn.Linear):
+                continue
+            targets.append((f"lllite_dit.{name}.layer1".replace(".", "_"), child))
+
+    per_dit[atomics] = targets
+    return targets
+
+
 # ----------------------------------------------------------------------------
 # ControlNetLLLiteDiT
 # ----------------------------------------------------------------------------
@@ -371,9 +531,14 @@ class ControlNetLLLiteDiT(nn.Module):
 
         n = len(self.lllite_modules)
         self.depth_embeds = nn.Parameter(torch.zeros(n, cond_emb_dim))
+        self._gate = _LLLiteGate()
+        self._cond_emb: Optional[torch.Tensor] = None
+        # (device, dtype) the weights were last ``place``d on; None = offloaded.
+        self._placement: Optional[tuple] = None
         for i, m in enumerate(self.lllite_modules):
             m.layer_idx = i
             m._depth_embeds_ref = [self.depth_embeds]
+            m._gate = self._gate
 
         aspp_info = f"aspp={'on' + str(list(self.aspp_dilations)) if use_aspp else 'off'}"
         inpaint_info = (
@@ -388,21 +553,6 @@ class ControlNetLLLiteDiT(nn.Module):
             inpaint_info,
         )
 
-    @staticmethod
-    def _attn_atomic_match(is_self_attn: bool, child_name: str, atomics: Tuple[str, ...]) -> bool:
-        if "output_proj" in child_name:
-            return False
-        if is_self_attn:
-            if child_name == "q_proj":
-                return "self_attn_q_pre" in atomics
-            if child_name in ("k_proj", "v_proj"):
-                return "self_attn_kv_pre" in atomics
-            return False
-        else:
-            if child_name == "q_proj":
-                return "cross_attn_q_pre" in atomics
-            return False  # cross_attn K,V live in text-embedding space
-
     def _create_modules(
         self,
         dit: nn.Module,
@@ -412,56 +562,79 @@ class ControlNetLLLiteDiT(nn.Module):
         dropout: Optional[float],
         multiplier: float,
     ) -> List[LLLiteModuleDiT]:
-        modules: List[LLLiteModuleDiT] = []
-        want_mlp_fc1 = "mlp_fc1_pre" in atomics
-        any_attn = any(a in atomics for a in ("self_attn_q_pre", "self_attn_kv_pre", "cross_attn_q_pre"))
-
-        for name, module in dit.named_modules():
-            if LLM_ADAPTER_NAME in name:
-                continue
-            cls = module.__class__.__name__
-
-            if any_attn and cls == TARGET_ATTENTION_CLASS:
-                # The Anima-block Attention exposes is_selfattn; the LLM-Adapter
-                # Attention does not — skip the latter even if path filter misses.
-                if not hasattr(module, "is_selfattn"):
-                    continue
-                is_self_attn = bool(module.is_selfattn)
-                for child_name, child in module.named_children():
-                    if not isinstance(child, nn.Linear):
-                        continue
-                    if not self._attn_atomic_match(is_self_attn, child_name, atomics):
-                        continue
-                    full_name = f"lllite_dit.{name}.{child_name}".replace(".", "_")
-                    modules.append(
-                        LLLiteModuleDiT(full_name, child, cond_emb_dim, mlp_dim, dropout, multiplier)
-                    )
-
-            elif want_mlp_fc1 and cls == TARGET_MLP_CLASS:
-                child = getattr(module, "layer1", None)
-                if not isinstance(child, nn.Linear):
-                    continue
-                full_name = f"lllite_dit.{name}.layer1".replace(".", "_")
-                modules.append(
-                    LLLiteModuleDiT(full_name, child, cond_emb_dim, mlp_dim, dropout, multiplier)
-                )
-
-        return modules
+        return [
+            LLLiteModuleDiT(full_name, child, cond_emb_dim, mlp_dim, dropout, multiplier)
+            for full_name, child in find_lllite_targets(dit, atomics)
+        ]
+
+    def encode_cond_image(self, cond_image: torch.Tensor) -> torch.Tensor:
+        """Run the ``conditioning1`` trunk once: (B, C, H*16, W*16) in [-1, 1]
+        -> cond embedding (B, S, cond_emb_dim).
+
+        The embedding only depends on the cond image, so callers can keep it
+        and hand it to ``set_cond_emb`` on every step instead of re-running the
+        trunk per model call. Batch elements are independent, so embeddings of
+        single images can be concatenated along dim 0.
+        """
+        with torch.no_grad():
+            return self.conditioning1(cond_image)
+
+    def set_cond_emb(self, cond_emb: Optional[torch.Tensor]):
+        """Set a precomputed cond embedding (see ``encode_cond_image``) on every
+        module and switch the network on; ``None`` switches it off.
+
+        Switching off keeps the embedding, so setting the same tensor again
+        (the usual case: one cond per run) only flips the shared gate.
+        """
+        if cond_emb is None:
+            self._gate.active = False
+            return
+        if cond_emb is not self._cond_emb:
+            for m in self.lllite_modules:
+                m.set_cond(cond_emb)
+            self._cond_emb = cond_emb
+        self._gate.active = True
 
     def set_cond_image(self, cond_image: Optional[torch.Tensor]):
         """cond_image: (B, 3, H*16, W*16) in [-1, 1]; ``None`` clears."""
         if cond_image is None:
-            for m in self.lllite_modules:
-                m.cond_emb = None
+            self.set_cond_emb(None)
             return
-        cx = self.conditioning1(cond_image)  # (B, S, cond_emb_dim)
-        for m in self.lllite_modules:
-            m.cond_emb = cx
+        self.set_cond_emb(self.encode_cond_image(cond_image))  # (B, S, cond_emb_dim)
 
     def clear_cond_image(self):
         self.set_cond_image(None)
 
+    def release_cond(self):
+        """Clear the cond and drop the precomputed per-module projections, so a
+        long-lived instance doesn't keep the last run's tensors alive."""
+        self._gate.active = False
+        self._cond_emb = None
+        for m in self.lllite_modules:
+            m.cond_emb = None
+            m._film = None
+            m._film_src = None
+            m._films.clear()
+
+    def place(self, device, dtype) -> bool:
+        """Move the weights to ``device``/``dtype`` unless they are already
+        there. Returns True if they moved (derived tensors are then stale)."""
+        if self._placement == (device, dtype):
+            return False
+        self.to(device=device, dtype=dtype)
+        self._placement = (device, dtype)
+        return True
+
+    def offload(self, device):
+        """Release the cond and park the weights on ``device`` between runs,
+        so a cached instance holds no sampling-device memory."""
+        self.release_cond()
+        self.to(device=device)
+        self._placement = None
+
     def set_multiplier(self, multiplier: float):
+        if multiplier == self.multiplier:
+            return
         self.multiplier = multiplier
         for m in self.lllite_modules:
             m.multiplier = multiplier
@@ -486,37 +659,56 @@ _SAVED_COND_PREFIX = "lllite_conditioning1."
 _SAVED_DEPTH_SUFFIX = ".depth_embed"
 
 
+def _internal_key(k: str, name_to_idx: dict) -> Tuple[Optional[str], Optional[int]]:
+    """Map one v2 named key to the internal layout. Returns
+    ``(internal_key, None)``, or ``(None, module_idx)`` for a per-module
+    ``depth_embed`` slice (those are stacked into ``depth_embeds``)."""
+    if k.startswith(_SAVED_COND_PREFIX):
+        return _INTERNAL_COND_PREFIX + k[len(_SAVED_COND_PREFIX):], None
+    if k.endswith(_SAVED_DEPTH_SUFFIX):
+        name = k[: -len(_SAVED_DEPTH_SUFFIX)]
+        if name in name_to_idx:
+            return None, name_to_idx[name]
+    head, dot, tail = k.partition(".")
+    if dot and head in name_to_idx:
+        return f"{_INTERNAL_MODULES_PREFIX}{name_to_idx[head]}.{tail}", None
+    return k, None
+
+
+def _stack_depth_slices(depth_slices: dict, n_modules: int) -> torch.Tensor:
+    missing = [i for i in range(n_modules) if i not in depth_slices]
+    if missing:
+        raise RuntimeError(
+            f"depth_embed slices missing for module idx(es) {missing}"
+        )
+    return torch.stack([depth_slices[i] for i in range(n_modules)], dim=0)
+
+
+def _check_not_legacy(keys, file: str):
+    if any(k.startswith(_INTERNAL_MODULES_PREFIX) for k in keys):
+        raise RuntimeError(
+            f"weights at {file} appear to be in a legacy ControlNet-LLLite weight format "
+            f"(keys starting with '{_INTERNAL_MODULES_PREFIX}'). The current code uses a "
+            f"named-key format (per-module key prefix = lllite_name, e.g. "
+            f"'lllite_dit_blocks_0_self_attn_q_proj.down.weight'). Re-train with the current codebase."
+        )
+
+
 def _from_saved_state_dict(lllite: "ControlNetLLLiteDiT", weights_sd: dict) -> dict:
     """Rewrite a v2 named-key state dict back to the internal layout."""
     name_to_idx = {m.lllite_name: i for i, m in enumerate(lllite.lllite_modules)}
-    n_modules = len(name_to_idx)
     out: dict = {}
     depth_slices: dict = {}
 
     for k, v in weights_sd.items():
-        if k.startswith(_SAVED_COND_PREFIX):
-            out[_INTERNAL_COND_PREFIX + k[len(_SAVED_COND_PREFIX):]] = v
-            continue
-        if k.endswith(_SAVED_DEPTH_SUFFIX):
-            name = k[: -len(_SAVED_DEPTH_SUFFIX)]
-            if name in name_to_idx:
-                depth_slices[name_to_idx[name]] = v
-                continue
-        head, dot, tail = k.partition(".")
-        if dot and head in name_to_idx:
-            out[f"{_INTERNAL_MODULES_PREFIX}{name_to_idx[head]}.{tail}"] = v
-            continue
-        out[k] = v
+        internal, depth_idx = _internal_key(k, name_to_idx)
+        if depth_idx is not None:
+            depth_slices[depth_idx] = v
+        else:
+            out[internal] = v
 
     if depth_slices:
-        missing = [i for i in range(n_modules) if i not in depth_slices]
-        if missing:
-            raise RuntimeError(
-                f"depth_embed slices missing for module idx(es) {missing}"
-            )
-        out[_INTERNAL_DEPTH_KEY] = torch.stack(
-            [depth_slices[i] for i in range(n_modules)], dim=0
-        )
+        out[_INTERNAL_DEPTH_KEY] = _stack_depth_slices(depth_slices, len(name_to_idx))
 
     return out
 
@@ -528,13 +720,7 @@ def load_lllite_weights(lllite: ControlNetLLLiteDiT, file: str, strict: bool = F
     else:
         weights_sd = torch.load(file, map_location="cpu")
 
-    if any(k.startswith(_INTERNAL_MODULES_PREFIX) for k in weights_sd):
-        raise RuntimeError(
-            f"weights at {file} appear to be in a legacy ControlNet-LLLite weight format "
-            f"(keys starting with '{_INTERNAL_MODULES_PREFIX}'). The current code uses a "
-            f"named-key format (per-module key prefix = lllite_name, e.g. "
-            f"'lllite_dit_blocks_0_self_attn_q_proj.down.weight'). Re-train with the current codebase."
-        )
+    _check_not_legacy(weights_sd, file)
 
     converted = _from_saved_state_dict(lllite, weights_sd)
     info = lllite.load_state_dict(converted, strict=strict)
@@ -542,6 +728,61 @@ def load_lllite_weights(lllite: ControlNetLLLiteDiT, file: str, strict: bool = F
     return info
 
 
+def load_lllite_weights_open(lllite: ControlNetLLLiteDiT, f, file: str,
+                             dtype: Optional[torch.dtype] = None) -> List[str]:
+    """Load weights from an already open ``safe_open`` handle ``f``.
+
+    Every tensor is read once, on the device ``f`` was opened with, cast to
+    ``dtype`` and assigned straight into its parameter slot — no state dict
+    is built, and ``lllite`` may have been constructed on the ``meta`` device
+    so its initial weights were never allocated. Returns the names of the
+    parameters the file did not provide (still ``meta`` if constructed there).
+    """
+    keys = list(f.keys())
+    _check_not_legacy(keys, file)
+
+    name_to_idx = {m.lllite_name: i for i, m in enumerate(lllite.lllite_modules)}
+    depth_slices: dict = {}
+    unexpected: List[str] = []
+
+    for k in keys:
+        internal, depth_idx = _internal_key(k, name_to_idx)
+        t = f.get_tensor(k)
+        if dtype is not None and t.is_floating_point() and t.dtype != dtype:
+            t = t.to(dtype)
+        if depth_idx is not None:
+            depth_slices[depth_idx] = t
+            continue
+        mod_name, _, attr = internal.rpartition(".")
+        try:
+            owner = lllite.get_submodule(mod_name)
+        except AttributeError:
+            owner = None
+        if owner is None or owner._parameters.get(attr) is None:
+            unexpected.append(k)
+            continue
+        expected = owner._parameters[attr].shape
+        if t.shape != expected:
+            raise RuntimeError(
+                f"size mismatch for {internal}: copying a param with shape {tuple(t.shape)} "
+                f"from {file}, the shape in current model is {tuple(expected)}."
+            )
+        owner._parameters[attr] = nn.Parameter(t, requires_grad=False)
+
+    if depth_slices:
+        lllite.depth_embeds = nn.Parameter(
+            _stack_depth_slices(depth_slices, len(name_to_idx)), requires_grad=False
+        )
+        # The modules reference the parameter object itself: re-point them.
+        for m in lllite.lllite_modules:
+            m._depth_embeds_ref = [lllite.depth_embeds]
+
+    missing = [n for n, p in lllite.named_parameters() if p.is_meta]
+    logger.info("loaded LLLite weights from %s: missing_keys=%s, unexpected_keys=%s",
+                file, missing, unexpected)
+    return missing
+
+
 def read_lllite_metadata(file: str) -> dict:
     if os.path.splitext(file)[1] != ".safetensors":
         return {}
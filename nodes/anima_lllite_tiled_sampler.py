@@ -25,25 +25,24 @@ here verbatim (algorithm and feathering from comfyui_essentials, MIT).
 
 from __future__ import annotations
 
+import functools
+import logging
+import random
+
 import torch
 import torch.nn.functional as F
 
+logger = logging.getLogger(__name__)
 
-# --- essentials tile/untile math (reimplemented; see module docstring) -------
 
-def _tile_image(image, rows, cols, overlap, overlap_x, overlap_y):
-    """Split ``image`` (B,H,W,C) into a (rows*cols, h, w, C) batch.
+# --- essentials tile/untile math (reimplemented; see module docstring) -------
 
-    Returns ``(tiles, tile_w_full, tile_h_full, overlap_w, overlap_h)`` where the
-    overlaps are the *computed* (and clamped) values — these must be fed back
-    into :func:`_untile_image` for the geometry to line up. Mirrors
-    ``comfyui_essentials.ImageTile``.
-    """
-    h, w = image.shape[1:3]
+def _tile_size(h, w, rows, cols, overlap, overlap_x, overlap_y):
+    """``(tile_h, tile_w, overlap_h, overlap_w)`` of the essentials tile grid
+    for an ``h`` x ``w`` image: the base tile size and the computed (clamped)
+    overlaps. Each tile is ``tile + overlap`` pixels per side."""
     tile_h = h // rows
     tile_w = w // cols
-    h = tile_h * rows
-    w = tile_w * cols
     overlap_h = int(tile_h * overlap) + overlap_y
     overlap_w = int(tile_w * overlap) + overlap_x
 
@@ -55,8 +54,16 @@ def _tile_image(image, rows, cols, overlap, overlap_x, overlap_y):
         overlap_h = 0
     if cols == 1:
         overlap_w = 0
+    return tile_h, tile_w, overlap_h, overlap_w
 
-    tiles = []
+
+def _tile_boxes(rows, cols, tile_h, tile_w, overlap_h, overlap_w):
+    """``(y1, y2, x1, x2)`` of every essentials tile, row-major, on a
+    ``rows * tile_h`` x ``cols * tile_w`` canvas. Each box is
+    ``tile + overlap`` per side; edge tiles are pushed back inside."""
+    h = tile_h * rows
+    w = tile_w * cols
+    boxes = []
     for i in range(rows):
         for j in range(cols):
             y1 = i * tile_h
@@ -77,57 +84,64 @@ def _tile_image(image, rows, cols, overlap, overlap_x, overlap_y):
                 x2 = w
                 x1 = x2 - tile_w - overlap_w
 
-            tiles.append(image[:, y1:y2, x1:x2, :])
-    tiles = torch.cat(tiles, dim=0)
+            boxes.append((y1, y2, x1, x2))
+    return boxes
+
+
+def _tile_image(image, rows, cols, overlap, overlap_x, overlap_y):
+    """Split ``image`` (B,H,W,C) into a (rows*cols, h, w, C) batch.
+
+    Returns ``(tiles, tile_w_full, tile_h_full, overlap_w, overlap_h)`` where the
+    overlaps are the *computed* (and clamped) values — these must be fed back
+    into :func:`_untile_image` for the geometry to line up. Mirrors
+    ``comfyui_essentials.ImageTile``.
+    """
+    h, w = image.shape[1:3]
+    tile_h, tile_w, overlap_h, overlap_w = _tile_size(h, w, rows, cols, overlap, overlap_x, overlap_y)
+
+    tiles = torch.cat([image[:, y1:y2, x1:x2, :]
+                       for y1, y2, x1, x2 in _tile_boxes(rows, cols, tile_h, tile_w, overlap_h, overlap_w)],
+                      dim=0)
 
     return tiles, tile_w + overlap_w, tile_h + overlap_h, overlap_w, overlap_h
 
 
+@functools.lru_cache(maxsize=8)
+def _untile_ramp(size, overlap, device, dtype):
+    """1-D feather weights for :func:`_untile_image`: ``linspace(0, 1)`` over
+    the first ``overlap`` entries, ones after. Shared: don't modify."""
+    ramp = torch.ones(size, device=device, dtype=dtype)
+    if overlap > 0:
+        ramp[:overlap] = torch.linspace(0, 1, overlap, device=device, dtype=dtype)
+    return ramp
+
+
 def _untile_image(tiles, overlap_x, overlap_y, rows, cols):
     """Feather + stitch a (rows*cols, h, w, C) batch back into one image.
 
-    Mirrors ``comfyui_essentials.ImageUntile`` (top/left overlap feathering).
+    Mirrors ``comfyui_essentials.ImageUntile`` (top/left overlap feathering)
+    bit for bit. Its mask is the outer product of a row and a column ramp,
+    so only those are built (once); each tile's mask is broadcast from them
+    and blended into the output in place.
     """
-    tile_h, tile_w = tiles.shape[1:3]
-    tile_h -= overlap_y
-    tile_w -= overlap_x
-    out_w = cols * tile_w
-    out_h = rows * tile_h
-
-    out = torch.zeros((1, out_h, out_w, tiles.shape[3]), device=tiles.device, dtype=tiles.dtype)
-
-    for i in range(rows):
-        for j in range(cols):
-            y1 = i * tile_h
-            x1 = j * tile_w
-
-            if i > 0:
-                y1 -= overlap_y
-            if j > 0:
-                x1 -= overlap_x
-
-            y2 = y1 + tile_h + overlap_y
-            x2 = x1 + tile_w + overlap_x
-
-            if y2 > out_h:
-                y2 = out_h
-                y1 = y2 - tile_h - overlap_y
-            if x2 > out_w:
-                x2 = out_w
-                x1 = x2 - tile_w - overlap_x
-
-            mask = torch.ones((1, tile_h + overlap_y, tile_w + overlap_x), device=tiles.device, dtype=tiles.dtype)
-
-            # feather the overlap on top
-            if i > 0 and overlap_y > 0:
-                mask[:, :overlap_y, :] *= torch.linspace(0, 1, overlap_y, device=tiles.device, dtype=tiles.dtype).unsqueeze(1)
-            # feather the overlap on left
-            if j > 0 and overlap_x > 0:
-                mask[:, :, :overlap_x] *= torch.linspace(0, 1, overlap_x, device=tiles.device, dtype=tiles.dtype).unsqueeze(0)
-
-            mask = mask.unsqueeze(-1).repeat(1, 1, 1, tiles.shape[3])
-            tile = tiles[i * cols + j] * mask
-            out[:, y1:y2, x1:x2, :] = out[:, y1:y2, x1:x2, :] * (1 - mask) + tile
+    full_h, full_w = tiles.shape[1:3]
+    tile_h = full_h - overlap_y
+    tile_w = full_w - overlap_x
+    device, dtype = tiles.device, tiles.dtype
+
+    out = torch.zeros((1, rows * tile_h, cols * tile_w, tiles.shape[3]), device=device, dtype=dtype)
+    ones_y = _untile_ramp(full_h, 0, device, dtype)
+    ones_x = _untile_ramp(full_w, 0, device, dtype)
+    # feather the overlap on top / on left
+    ramp_y = _untile_ramp(full_h, overlap_y, device, dtype)
+    ramp_x = _untile_ramp(full_w, overlap_x, device, dtype)
+
+    for k, (y1, y2, x1, x2) in enumerate(_tile_boxes(rows, cols, tile_h, tile_w, overlap_y, overlap_x)):
+        i, j = divmod(k, cols)
+        mask = ((ramp_y if i > 0 else ones_y).unsqueeze(1)
+                * (ramp_x if j > 0 else ones_x).unsqueeze(0)).unsqueeze(-1)
+        region = out[0, y1:y2, x1:x2]
+        region.mul_(1 - mask).add_(tiles[k] * mask)
     return out
 
 
@@ -192,9 +206,24 @@ def _color_match_wavelet(target, ref):
 
 # --- MultiDiffusion latent tiling (overlap-averaged each denoising step) ------
 
-def _md_spans(total, n, ext):
+def _md_spans(total, n, ext, uniform=False):
     """Cover [0, total] with ``n`` spans; interior edges extended by ``ext`` so
-    neighbours overlap, first span starts at 0 and last reaches ``total``."""
+    neighbours overlap, first span starts at 0 and last reaches ``total``.
+
+    With ``uniform`` every span gets the same length (an interior span's
+    ``ceil(total / n) + 2 * ext``) and the starts are spread evenly, so all
+    tiles share one shape and can be stacked into a single model batch. Falls
+    back to the default layout when a uniform span would cover everything.
+    """
+    if uniform and n > 1:
+        length = -(-total // n) + 2 * ext
+        if length < total:
+            slack = total - length
+            spans = []
+            for i in range(n):
+                s = (i * slack + (n - 1) // 2) // (n - 1)  # rounded even spread
+                spans.append((s, s + length))
+            return spans
     base = max(1, total // n)
     spans = []
     for i in range(n):
@@ -218,6 +247,357 @@ def _md_weight_1d(length, taper_left, taper_right, device, dtype):
     return w
 
 
+def _md_grid(latent_h, latent_w, rows, columns, overlap, overlap_x, overlap_y, uniform=False):
+    """Latent-space tile grid ``(ys, xs)`` for a rows x columns MultiDiffusion
+    pass. Covers the full latent; the pixel overlaps are converted to latent
+    units and clamped to half a tile."""
+    tile_hl = max(1, latent_h // rows)
+    tile_wl = max(1, latent_w // columns)
+    ov_hl = 0 if rows == 1 else min(int(tile_hl * overlap) + overlap_y // 8, tile_hl // 2)
+    ov_wl = 0 if columns == 1 else min(int(tile_wl * overlap) + overlap_x // 8, tile_wl // 2)
+    return _md_spans(latent_h, rows, ov_hl, uniform), _md_spans(latent_w, columns, ov_wl, uniform)
+
+
+def _md_build_tiles(ys, xs, device, dtype):
+    """Tile dicts (``y0``/``y1``/``x0``/``x1``/``weight``) for a span grid.
+
+    Each ``weight`` is the tile's blend ramp already divided by the summed
+    weight of every tile covering the same latent pixel, so a denoising step
+    only has to add ``eps * weight`` into an accumulator — no per-step weight
+    sum or division. Computed in float32 and cast to ``dtype`` at the end.
+    """
+    latent_h, latent_w = ys[-1][1], xs[-1][1]
+    tiles = []
+    for i, (y0, y1) in enumerate(ys):
+        ty_l = (ys[i - 1][1] - y0) if i > 0 else 0
+        ty_r = (y1 - ys[i + 1][0]) if i < len(ys) - 1 else 0
+        wy = _md_weight_1d(y1 - y0, ty_l, ty_r, device, torch.float32)
+        for j, (x0, x1) in enumerate(xs):
+            tx_l = (xs[j - 1][1] - x0) if j > 0 else 0
+            tx_r = (x1 - xs[j + 1][0]) if j < len(xs) - 1 else 0
+            wx = _md_weight_1d(x1 - x0, tx_l, tx_r, device, torch.float32)
+            weight = wy[:, None] * wx[None, :]  # (th, tw)
+            tiles.append({"idx": len(tiles), "y0": y0, "y1": y1, "x0": x0, "x1": x1,
+                          "weight": weight})
+
+    wsum = torch.zeros((latent_h, latent_w), device=device, dtype=torch.float32)
+    for td in tiles:
+        wsum[td["y0"]:td["y1"], td["x0"]:td["x1"]] += td["weight"]
+    wsum.clamp_(min=1e-6)
+    for td in tiles:
+        norm = td["weight"] / wsum[td["y0"]:td["y1"], td["x0"]:td["x1"]]
+        td["weight"] = norm.to(dtype)
+    return tiles
+
+
+def _md_shifted_spans(total, n, offset):
+    """Cover [0, total] with non-overlapping spans cut every ``total // n``
+    starting at ``offset``. Edge slivers shorter than half a span are merged
+    into their neighbour so no tile gets too small for the model."""
+    base = max(1, total // n)
+    bounds = [0] + [c for c in range(offset, total, base) if c > 0] + [total]
+    if len(bounds) > 2 and bounds[1] - bounds[0] < base // 2:
+        del bounds[1]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < base // 2:
+        del bounds[-2]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _md_shifted_max_span(total, n):
+    """Longest span ``_md_shifted_spans(total, n, offset)`` can return for any
+    offset: a base span plus a merged edge sliver (under half a span) plus
+    the remainder of ``total // n``. Sizes SpotDiffusion tiles for memory."""
+    if n <= 1:
+        return total
+    base = max(1, total // n)
+    return min(total, max(base, base + base // 2 - 1) + max(0, total - n * base))
+
+
+def _md_shifted_tiles(latent_h, latent_w, rows, columns, seed, sigma):
+    """SpotDiffusion tiles for one denoising step: a non-overlapping grid whose
+    origin is shifted by a random offset, so the tile borders move every step
+    and seams average out over time without any overlap compute.
+
+    The offset is derived from ``(seed, sigma)``: reproducible, and the same
+    for every model call of a step (e.g. separate cond/uncond calls). Tiles
+    carry ``weight=None`` — they are copied, not blended, into the output.
+    """
+    rng = random.Random(f"{seed}:{sigma:.6g}")
+    oy = rng.randrange(max(1, latent_h // rows)) if rows > 1 else 0
+    ox = rng.randrange(max(1, latent_w // columns)) if columns > 1 else 0
+    return [{"y0": y0, "y1": y1, "x0": x0, "x1": x1, "weight": None}
+            for y0, y1 in _md_shifted_spans(latent_h, rows, oy)
+            for x0, x1 in _md_shifted_spans(latent_w, columns, ox)]
+
+
+def _md_accumulator(state, like):
+    """Zeroed accumulation buffer shaped like ``like``, kept in ``state`` and
+    reused across denoising steps instead of allocated fresh every call.
+
+    The wrapper returns this buffer; the sampler consumes the prediction
+    before the next model call, so reusing it on the next step is safe.
+    """
+    key = (tuple(like.shape), like.device, like.dtype)
+    buf = state["buffers"].get(key)
+    if buf is None:
+        buf = state["buffers"][key] = torch.empty_like(like)
+    return buf.zero_()
+
+
+def _md_scatter(acc, td, eps):
+    """Write one tile's prediction into the accumulator: weighted add for
+    blended tiles, plain copy for non-overlapping (``weight=None``) ones."""
+    region = acc[..., td["y0"]:td["y1"], td["x0"]:td["x1"]]
+    w = td["weight"]
+    if w is None:
+        region.copy_(eps)
+    else:
+        region.addcmul_(eps, w.view((1,) * (eps.ndim - 2) + tuple(w.shape)))
+
+
+def _md_freeze_state():
+    """Fresh bookkeeping for per-tile convergence freezing."""
+    return {"sigma": None, "step": -1, "cache": {}, "evals": 0, "skipped": 0}
+
+
+def _md_freeze_key(x_in, c):
+    """Identify a model call within a step (e.g. separate cond/uncond calls),
+    so a tile's cached prediction is only reused for the same kind of call."""
+    to = c.get("transformer_options", {})
+    return (int(x_in.shape[0]), tuple(to.get("cond_or_uncond", ())))
+
+
+def _md_freeze_split(freeze, group, key, sigma, refresh):
+    """Split ``group`` into tiles that need a model call and ``(td, pred)``
+    pairs whose frozen prediction can be reused this step.
+
+    A frozen tile is re-evaluated every ``refresh`` steps (counted as distinct
+    sigmas) so it can thaw if it starts changing again.
+    """
+    if freeze["sigma"] != sigma:
+        freeze["sigma"] = sigma
+        freeze["step"] += 1
+    run, reuse = [], []
+    for td in group:
+        entry = freeze["cache"].get((td["idx"], key))
+        if entry is not None and entry["frozen"] and freeze["step"] - entry["step"] < refresh:
+            reuse.append((td, entry["pred"]))
+        else:
+            run.append(td)
+    freeze["evals"] += len(run)
+    freeze["skipped"] += len(reuse)
+    return run, reuse
+
+
+def _md_freeze_record(freeze, td, key, eps, threshold):
+    """Cache a tile's fresh prediction and freeze the tile when its mean
+    relative change since the previous evaluation is below ``threshold``."""
+    entry = freeze["cache"].get((td["idx"], key))
+    frozen = False
+    if entry is not None and entry["pred"].shape == eps.shape:
+        prev = entry["pred"]
+        delta = (eps - prev).abs().mean() / prev.abs().mean().clamp(min=1e-6)
+        frozen = float(delta) < threshold
+    # Clone: ``eps`` may be a view into a whole batched-group output.
+    freeze["cache"][(td["idx"], key)] = {
+        "pred": eps.detach().clone(), "step": freeze["step"], "frozen": frozen,
+    }
+
+
+def _md_tile_groups(tiles, tile_batch_size):
+    """Group tile dicts into chunks of at most ``tile_batch_size`` tiles that
+    share the same (h, w), so each chunk can run as one batched model call."""
+    by_shape = {}
+    for td in tiles:
+        by_shape.setdefault((td["y1"] - td["y0"], td["x1"] - td["x0"]), []).append(td)
+    n = max(1, int(tile_batch_size))
+    groups = []
+    for same in by_shape.values():
+        groups.extend(same[i:i + n] for i in range(0, len(same), n))
+    return groups
+
+
+def _md_repeat_batch(t, c, batch, k):
+    """Repeat the per-sample timestep and conditioning ``k`` times each
+    (``repeat_interleave``), matching a batch laid out as (batch, k) with the
+    ``k`` tiles of every sample next to each other. Tensors whose leading dim
+    isn't the sample batch are passed through unchanged."""
+    def rep(v):
+        if torch.is_tensor(v) and v.ndim > 0 and v.shape[0] == batch:
+            return v.repeat_interleave(k, dim=0)
+        return v
+
+    c_k = {}
+    for key, v in c.items():
+        if key == "transformer_options" and isinstance(v, dict):
+            # Each cond_or_uncond chunk stays contiguous (just k times longer),
+            # so only the per-sample sigmas need expanding.
+            v = dict(v)
+            if "sigmas" in v:
+                v["sigmas"] = rep(v["sigmas"])
+        else:
+            v = rep(v)
+        c_k[key] = v
+    return rep(t), c_k
+
+
+def _md_group_geometry(state, group, x_in):
+    """Flat gather/scatter index and stacked blend weights for a group of
+    same-sized tiles, so the whole group moves in or out of the latent with a
+    single indexing op instead of one strided slice per tile.
+
+    ``index`` holds, tile-major, the flat (row * W + col) position of every
+    latent pixel each tile covers; ``weight`` is the (k, th, tw) stack of
+    the tiles' blend weights, or ``None`` for copy-only tiles; ``overlap``
+    says whether any two tiles share a pixel (``index`` has duplicates).
+    Cached in ``state["geoms"]`` for the fixed grid (shifted tiles change
+    every step).
+    """
+    cache_key = tuple(td["idx"] for td in group) if "idx" in group[0] else None
+    if cache_key is not None and cache_key in state["geoms"]:
+        return state["geoms"][cache_key]
+
+    device = x_in.device
+    th = group[0]["y1"] - group[0]["y0"]
+    tw = group[0]["x1"] - group[0]["x0"]
+    y0 = torch.tensor([td["y0"] for td in group], device=device)
+    x0 = torch.tensor([td["x0"] for td in group], device=device)
+    rows = y0[:, None, None] + torch.arange(th, device=device)[None, :, None]
+    cols = x0[:, None, None] + torch.arange(tw, device=device)[None, None, :]
+    geom = {
+        "index": (rows * x_in.shape[-1] + cols).flatten(),
+        "shape": (len(group), th, tw),
+        "weight": (None if group[0]["weight"] is None
+                   else torch.stack([td["weight"] for td in group], dim=0)),
+        "overlap": any(a["y0"] < b["y1"] and b["y0"] < a["y1"] and a["x0"] < b["x1"] and b["x0"] < a["x1"]
+                       for i, a in enumerate(group) for b in group[i + 1:]),
+    }
+    if cache_key is not None:
+        state["geoms"][cache_key] = geom
+    return geom
+
+
+def _md_eval_group(call, x_in, t, c, group, geom=None):
+    """Run ``call(x, t, c)`` on every tile of ``group`` in one model call and
+    return the predictions as a (batch, k, ...) tensor (tile ``j`` = ``[:, j]``).
+
+    The tiles are stacked as (batch, k, ...) and flattened, so sample ``b``'s
+    copy of tile ``j`` sits at index ``b * k + j``. That is also the layout a
+    (k, ...) per-tile LLLite cond broadcasts to, so the control crops line up.
+    With a ``geom`` from :func:`_md_group_geometry` the tiles are gathered with
+    one ``index_select`` instead of one slice per tile.
+    """
+    batch, k = x_in.shape[0], len(group)
+    if k == 1:
+        td = group[0]
+        return call(x_in[..., td["y0"]:td["y1"], td["x0"]:td["x1"]], t, c).unsqueeze(1)
+    if geom is not None:
+        flat = x_in.reshape(tuple(x_in.shape[:-2]) + (-1,))
+        tiles = flat.index_select(-1, geom["index"])
+        tiles = tiles.view(tuple(x_in.shape[:-2]) + geom["shape"]).movedim(-3, 1)
+    else:
+        crops = [x_in[..., td["y0"]:td["y1"], td["x0"]:td["x1"]] for td in group]
+        tiles = torch.stack(crops, dim=1)
+    t_k, c_k = _md_repeat_batch(t, c, batch, k)
+    eps = call(tiles.flatten(0, 1), t_k, c_k)
+    return eps.view((batch, k) + tuple(eps.shape[1:]))
+
+
+def _md_scatter_group(acc, group, eps, geom=None):
+    """Write a group's (batch, k, ...) predictions into the accumulator.
+
+    With a ``geom`` of non-overlapping tiles the weighted predictions of all
+    ``k`` tiles are added with a single ``index_add_`` (or ``index_copy_`` for
+    copy-only tiles) on the flattened latent. Overlapping tiles go through
+    :func:`_md_scatter` one by one in tile order instead: ``index_add_`` with
+    duplicate indices uses atomic adds on CUDA, whose summation order (and
+    so the result) can change from run to run at the same seed.
+    """
+    if geom is None or geom["overlap"]:
+        for j, td in enumerate(group):
+            _md_scatter(acc, td, eps[:, j])
+        return
+    vals = eps.movedim(1, -3)  # (batch, C, ..., k, th, tw)
+    if geom["weight"] is not None:
+        vals = vals * geom["weight"]
+    flat = acc.view(tuple(acc.shape[:-2]) + (-1,))
+    vals = vals.reshape(tuple(flat.shape[:-1]) + (-1,))
+    if geom["weight"] is None:
+        flat.index_copy_(-1, geom["index"], vals.to(flat.dtype))
+    else:
+        flat.index_add_(-1, geom["index"], vals.to(flat.dtype))
+
+
+def _md_encode(vae, vae_encoder, img, tiled=False, tile_size=512):
+    """VAE-encode the whole image for a whole-latent pass. ``tiled`` encodes
+    in ``tile_size`` pixel tiles, so the encode's peak VRAM stays tile-sized
+    instead of relying on ComfyUI's (slow) out-of-memory fallback."""
+    if tiled:
+        from nodes import VAEEncodeTiled
+        return VAEEncodeTiled().encode(vae, img, tile_size=tile_size,
+                                       overlap=min(64, tile_size // 4))[0]
+    return vae_encoder.encode(vae, img)[0]
+
+
+# --- VRAM-aware automatic grid ------------------------------------------------
+
+# Fraction of the estimated free VRAM a single model call may plan to use.
+_AUTO_GRID_HEADROOM = 0.8
+# Largest rows/columns the auto grid will try, and the smallest latent tile
+# side it will produce (64 latent px = 512 image px).
+_AUTO_GRID_MAX_SPLITS = 16
+_AUTO_GRID_MIN_TILE = 64
+
+
+def _md_auto_grid(model, latent_h, latent_w, overlap, overlap_x, overlap_y,
+                  call_batch, uniform=False, shifted=False):
+    """Pick the rows x columns grid with the fewest tiles whose per-call model
+    activations fit the free sampling-device memory.
+
+    Activation memory comes from the model's own estimate
+    (``ModelPatcher.memory_required``) for a ``call_batch``-sized tile batch,
+    checked against the free memory reported by ``comfy.model_management``
+    minus the weights that still have to be loaded and ComfyUI's inference
+    reserve, scaled by ``_AUTO_GRID_HEADROOM``. Ties between equal tile counts
+    go to the squarest tiles. ``shifted`` (SpotDiffusion) checks the largest
+    tile the moving grid can produce (``_md_shifted_max_span``).
+
+    Returns ``(rows, columns, tile_h, tile_w, fits)``; when nothing fits,
+    the finest allowed grid is returned with ``fits=False``.
+    """
+    import math
+
+    import comfy.model_management as mm
+
+    device = mm.get_torch_device()
+    free = mm.get_free_memory(device)
+    loaded = model.loaded_size() if hasattr(model, "loaded_size") else 0
+    pending_weights = max(0, model.model_size() - loaded)
+    budget = (free - pending_weights - mm.minimum_inference_memory()) * _AUTO_GRID_HEADROOM
+
+    channels = int(model.model.latent_format.latent_channels)
+    max_rows = max(1, min(_AUTO_GRID_MAX_SPLITS, latent_h // _AUTO_GRID_MIN_TILE))
+    max_cols = max(1, min(_AUTO_GRID_MAX_SPLITS, latent_w // _AUTO_GRID_MIN_TILE))
+
+    candidates = []
+    for r in range(1, max_rows + 1):
+        for c in range(1, max_cols + 1):
+            if shifted:
+                th, tw = _md_shifted_max_span(latent_h, r), _md_shifted_max_span(latent_w, c)
+            else:
+                ys, xs = _md_grid(latent_h, latent_w, r, c, overlap, overlap_x, overlap_y, uniform)
+                th = max(y1 - y0 for y0, y1 in ys)
+                tw = max(x1 - x0 for x0, x1 in xs)
+            candidates.append((r * c, abs(math.log(th / tw)), r, c, th, tw))
+    candidates.sort()
+
+    for _, _, r, c, th, tw in candidates:
+        if model.memory_required((call_batch, channels, th, tw)) <= budget:
+            return r, c, th, tw, True
+    _, _, r, c, th, tw = max(candidates, key=lambda cand: (cand[0], -cand[1]))
+    return r, c, th, tw, False
+
+
 class VSLinx_AnimaLLLiteTiledSampler:
     @classmethod
     def INPUT_TYPES(cls):
@@ -234,8 +614,8 @@ class VSLinx_AnimaLLLiteTiledSampler:
                 "negative": ("CONDITIONING",),
                 "vae": ("VAE",),
 
-                "sampling_mode": (["per_tile", "multidiffusion"],
-                    {"tooltip": "per_tile: sample each tile fully then stitch (lowest VRAM; can show seams/ghosting). multidiffusion: one sampling pass over the whole image, averaging overlapping tiles in latent space every step — tiles stay in sync so seams and double-exposure are eliminated (slightly more VRAM). In multidiffusion mode the 'method' and 'color_match' fields are not used."}),
+                "sampling_mode": (["per_tile", "multidiffusion", "spotdiffusion"],
+                    {"tooltip": "per_tile: sample each tile fully then stitch (lowest VRAM; can show seams/ghosting). multidiffusion: one sampling pass over the whole image, averaging overlapping tiles in latent space every step — tiles stay in sync so seams and double-exposure are eliminated (slightly more VRAM). spotdiffusion: like multidiffusion but with non-overlapping tiles whose grid is randomly shifted every step, so seams average out over time with no overlap compute (the overlap fields are not used). In multidiffusion/spotdiffusion mode the 'method' and 'color_match' fields are not used."}),
 
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff, "control_after_generate": True}),
                 "steps": ("INT", {"default": 20, "min": 1, "max": 10000}),
@@ -269,14 +649,28 @@ class VSLinx_AnimaLLLiteTiledSampler:
                     "tooltip": "How strongly to apply the color match (0 = off, 1 = full)."}),
 
                 "vae_decode_tiled": ("BOOLEAN", {"default": False,
-                    "tooltip": "(multidiffusion only) Decode the final full-image latent in tiles instead of one pass, to avoid a single huge VAE decode that can spike VRAM (or spill into slow shared system memory). No effect in per_tile mode, where each tile is already decoded on its own."}),
+                    "tooltip": "(multidiffusion/spotdiffusion, or per_tile with per_tile_vae = encode_decode_once) Decode the final full-image latent in tiles instead of one pass, to avoid a single huge VAE decode that can spike VRAM (or spill into slow shared system memory). No effect when per_tile decodes each tile on its own."}),
                 "vae_decode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32,
-                    "tooltip": "(multidiffusion only) Tile size in pixels for the tiled VAE decode."}),
+                    "tooltip": "Tile size in pixels for the tiled VAE decode."}),
+                "tile_batch_size": ("INT", {"default": 1, "min": 1, "max": 256, "step": 1,
+                    "tooltip": "How many same-sized tiles to run through the model in one call each step. 1 evaluates tiles one at a time (lowest VRAM). Higher values stack tiles along the batch dimension for better GPU utilisation on fine grids, at the cost of tile_batch_size x the per-tile activation VRAM. multidiffusion/spotdiffusion: the grid is then laid out with uniform tile sizes so every tile can share a batch. per_tile: that many tiles are encoded, sampled and decoded together as one batch, each with its own LLLite control crop and the starting noise it would get on its own (deterministic samplers like euler match one-at-a-time results; ancestral/SDE samplers draw per-step noise for the whole batch, so tiles after the first differ slightly)."}),
+                "freeze_threshold": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.001,
+                    "tooltip": "(multidiffusion only) Per-tile convergence freezing. When a tile's prediction changes by less than this fraction between steps, its cached prediction is reused instead of calling the model for it, until the next refresh. Saves compute on flat areas (sky, backgrounds) in low-denoise refines. 0 = off. Try 0.01-0.05."}),
+                "freeze_refresh": ("INT", {"default": 4, "min": 1, "max": 1000, "step": 1,
+                    "tooltip": "(multidiffusion only) A frozen tile is re-evaluated every this many steps, so it can thaw if it starts changing again."}),
+                "grid_mode": (["manual", "auto"], {"default": "manual",
+                    "tooltip": "manual: use rows/columns as set. auto: pick the fewest tiles whose per-tile model activations fit the free VRAM (with a safety margin), from the model's own memory estimate - rows/columns are then ignored. The chosen grid is logged and returned on the rows/columns outputs."}),
+                "vae_encode_tiled": ("BOOLEAN", {"default": False,
+                    "tooltip": "(multidiffusion/spotdiffusion, or per_tile with a per_tile_vae *_once option) Encode the full image in tiles instead of one pass, so the initial VAE encode can't spike VRAM on very large images. No effect when per_tile encodes each tile on its own."}),
+                "vae_encode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32,
+                    "tooltip": "Tile size in pixels for the tiled VAE encode."}),
+                "per_tile_vae": (["per_tile", "encode_once", "encode_decode_once"], {"default": "per_tile",
+                    "tooltip": "(per_tile only) per_tile: encode and decode every tile on its own (overlaps are encoded 2-4 times). encode_once: encode the full image once (tiled with vae_encode_tiled) and cut each tile's latent from it on 8-pixel boundaries; tiles are still decoded and color-matched on their own. encode_decode_once: additionally feather the sampled tile latents together and decode the result once (tiled with vae_decode_tiled); color_match is then applied to the whole image. The *_once options snap the tile grid to the 8-pixel latent grid."}),
             },
         }
 
-    RETURN_TYPES = ("IMAGE",)
-    RETURN_NAMES = ("image",)
+    RETURN_TYPES = ("IMAGE", "INT", "INT")
+    RETURN_NAMES = ("image", "rows", "columns")
     FUNCTION = "execute"
     CATEGORY = "vsLinx/sampling"
     DESCRIPTION = (
@@ -300,7 +694,11 @@ class VSLinx_AnimaLLLiteTiledSampler:
                 rows, columns, overlap, overlap_x, overlap_y, method,
                 color_match="none", color_match_strength=1.0,
                 sampling_mode="per_tile",
-                vae_decode_tiled=False, vae_decode_tile_size=512):
+                vae_decode_tiled=False, vae_decode_tile_size=512,
+                tile_batch_size=1, grid_mode="manual",
+                freeze_threshold=0.0, freeze_refresh=4,
+                vae_encode_tiled=False, vae_encode_tile_size=512,
+                per_tile_vae="per_tile"):
         import comfy.utils
         import folder_paths
         from nodes import VAEEncode, VAEDecode, common_ksampler
@@ -317,7 +715,24 @@ class VSLinx_AnimaLLLiteTiledSampler:
         vae_decoder = VAEDecode()
         batch_size = image.shape[0]
 
-        if sampling_mode == "multidiffusion":
+        if grid_mode == "auto":
+            # cond + uncond share a call unless cfg is 1 (uncond is skipped).
+            call_batch = (1 if cfg == 1.0 else 2) * tile_batch_size
+            rows, columns, th, tw, fits = _md_auto_grid(
+                model, image.shape[1] // 8, image.shape[2] // 8,
+                overlap, overlap_x, overlap_y, call_batch,
+                uniform=sampling_mode != "per_tile" and tile_batch_size > 1,
+                shifted=sampling_mode == "spotdiffusion",
+            )
+            if fits:
+                logger.info("[vsLinx] Anima tiled sampler auto grid: %d x %d (tiles up to %dx%d px)",
+                            rows, columns, tw * 8, th * 8)
+            else:
+                logger.warning("[vsLinx] Anima tiled sampler auto grid: no grid fits the free VRAM; "
+                               "using the finest allowed grid %d x %d (tiles up to %dx%d px)",
+                               rows, columns, tw * 8, th * 8)
+
+        if sampling_mode in ("multidiffusion", "spotdiffusion"):
             pbar = comfy.utils.ProgressBar(batch_size)
             results = []
             for b in range(batch_size):
@@ -328,9 +743,12 @@ class VSLinx_AnimaLLLiteTiledSampler:
                     rows, columns, overlap, overlap_x, overlap_y,
                     vae_encoder, vae_decoder,
                     vae_decode_tiled, vae_decode_tile_size,
+                    tile_batch_size, shifted=sampling_mode == "spotdiffusion",
+                    freeze_threshold=freeze_threshold, freeze_refresh=freeze_refresh,
+                    vae_encode_tiled=vae_encode_tiled, vae_encode_tile_size=vae_encode_tile_size,
                 ))
                 pbar.update(1)
-            return (torch.cat(results, dim=0),)
+            return (torch.cat(results, dim=0), rows, columns)
 
         def color_correct(target, ref):
             """Match ``target``'s colour to source ``ref`` per the selected mode."""
@@ -345,21 +763,51 @@ class VSLinx_AnimaLLLiteTiledSampler:
                 return matched
             return target * (1.0 - color_match_strength) + matched * color_match_strength
 
-        def sample_region(region_img, region_denoise):
-            """LLLite-patched img2img over one region; returns the decoded image."""
-            rh, rw = region_img.shape[1], region_img.shape[2]
+        def sample_latents(samples, cond_img, region_denoise):
+            """LLLite-patched img2img over a batch of same-sized region latents,
+            each controlled by its own image; returns the sampled LATENT."""
             patched_model = apply_anima_lllite(
-                model, weights_path, region_img, strength,
-                start_percent, end_percent, preserve_wrapper,
+                model, weights_path, cond_img, strength,
+                start_percent, end_percent, preserve_wrapper, per_sample=True,
             )
-            latent = vae_encoder.encode(vae, region_img)[0]
-            sampled = common_ksampler(
+            latent = {"samples": samples}
+            if samples.shape[0] > 1:
+                # Every region starts from the noise it would get sampled on
+                # its own (ancestral/SDE per-step noise is drawn per batch).
+                latent["batch_index"] = [0] * samples.shape[0]
+            return common_ksampler(
                 patched_model, seed, steps, cfg, sampler_name, scheduler,
                 positive, negative, latent, denoise=region_denoise,
             )[0]
-            decoded = vae_decoder.decode(vae, sampled)[0]
+
+        def sample_region(region_img, region_denoise):
+            """``sample_latents`` from pixels: encodes the regions, samples them
+            and returns the decoded batch at the regions' size."""
+            rh, rw = region_img.shape[1], region_img.shape[2]
+            # One encode/decode per region: video VAEs (Anima's included) treat
+            # a 4-D image batch as the frames of one clip, which would merge
+            # the regions into a single latent.
+            samples = torch.cat([vae_encoder.encode(vae, region_img[j:j + 1])[0]["samples"]
+                                 for j in range(region_img.shape[0])], dim=0)
+            sampled = sample_latents(samples, region_img, region_denoise)["samples"]
+            decoded = torch.cat([vae_decoder.decode(vae, {"samples": sampled[j:j + 1]})[0]
+                                 for j in range(sampled.shape[0])], dim=0)
             return _resize_to(decoded, rh, rw, method)
 
+        if per_tile_vae != "per_tile":
+            pbar = comfy.utils.ProgressBar(batch_size * rows * columns)
+            results = []
+            for b in range(batch_size):
+                results.append(self._run_per_tile_encode_once(
+                    image[b:b + 1], vae, vae_encoder, vae_decoder, sample_latents,
+                    rows, columns, overlap, overlap_x, overlap_y, method,
+                    tile_batch_size, denoise, color_correct, pbar,
+                    decode_once=per_tile_vae == "encode_decode_once",
+                    vae_encode_tiled=vae_encode_tiled, vae_encode_tile_size=vae_encode_tile_size,
+                    vae_decode_tiled=vae_decode_tiled, vae_decode_tile_size=vae_decode_tile_size,
+                ))
+            return (torch.cat(results, dim=0), rows, columns)
+
         # Process each image of an input batch independently and stitch each one
         # back on its own, so a batch of N images comes out as a batch of N
         # results (without this the tiles of different images would be mixed).
@@ -372,40 +820,110 @@ class VSLinx_AnimaLLLiteTiledSampler:
             )
 
             out_tiles = []
-            for idx in range(tiles.shape[0]):
-                tile_img = tiles[idx:idx + 1]
-                # sample_region already returns the tile at its original size
+            # All essentials tiles share one size, so up to tile_batch_size of
+            # them are sampled together as one batch.
+            for start in range(0, tiles.shape[0], tile_batch_size):
+                chunk = tiles[start:start + tile_batch_size]
+                # sample_region already returns the tiles at their original size
                 # (it resizes internally), keeping the untile geometry exact even
                 # if the VAE rounds dims to a multiple of 8.
-                decoded = sample_region(tile_img, denoise)
-                # Re-anchor each tile's colour to its source so tiles can't drift
-                # in tone relative to each other (fixes tonal seams).
-                decoded = color_correct(decoded, tile_img)
-                out_tiles.append(decoded)
-                pbar.update(1)
+                decoded = sample_region(chunk, denoise)
+                for j in range(chunk.shape[0]):
+                    # Re-anchor each tile's colour to its source so tiles can't
+                    # drift in tone relative to each other (fixes tonal seams).
+                    out_tiles.append(color_correct(decoded[j:j + 1], chunk[j:j + 1]))
+                    pbar.update(1)
 
             results.append(_untile_image(
                 torch.cat(out_tiles, dim=0), ov_w, ov_h, rows, columns
             ))
 
-        return (torch.cat(results, dim=0),)
+        return (torch.cat(results, dim=0), rows, columns)
+
+    def _run_per_tile_encode_once(self, img, vae, vae_encoder, vae_decoder, sample_latents,
+                                  rows, columns, overlap, overlap_x, overlap_y, method,
+                                  tile_batch_size, denoise, color_correct, pbar,
+                                  decode_once=False,
+                                  vae_encode_tiled=False, vae_encode_tile_size=512,
+                                  vae_decode_tiled=False, vae_decode_tile_size=512):
+        """per_tile sampling of one image from a single full-image VAE encode.
+
+        The tile grid is laid out on the latent (pixel overlaps converted at 8
+        px per latent cell), so every tile's latent is a plain slice of the
+        encoded image instead of a fresh encode of its overlapping crop. With
+        ``decode_once`` the sampled tiles are feathered together in latent
+        space and decoded in one pass; otherwise each tile is decoded, colour
+        matched and stitched in pixel space as in the regular per_tile mode.
+        """
+        h, w = img.shape[1], img.shape[2]
+        x0 = _md_encode(vae, vae_encoder, img, vae_encode_tiled, vae_encode_tile_size)["samples"]
+        tile_h, tile_w, ov_h, ov_w = _tile_size(
+            x0.shape[-2], x0.shape[-1], rows, columns, overlap, overlap_x // 8, overlap_y // 8
+        )
+        boxes = _tile_boxes(rows, columns, tile_h, tile_w, ov_h, ov_w)
+
+        out_tiles = []
+        for start in range(0, len(boxes), tile_batch_size):
+            chunk = boxes[start:start + tile_batch_size]
+            samples = torch.cat([x0[..., y1:y2, x1:x2] for y1, y2, x1, x2 in chunk], dim=0)
+            crops = torch.cat([img[:, y1 * 8:y2 * 8, x1 * 8:x2 * 8, :] for y1, y2, x1, x2 in chunk], dim=0)
+            sampled = sample_latents(samples, crops, denoise)
+            if decode_once:
+                out_tiles.append(sampled["samples"])
+            else:
+                decoded = torch.cat([vae_decoder.decode(vae, {"samples": sampled["samples"][j:j + 1]})[0]
+                                     for j in range(len(chunk))], dim=0)
+                decoded = _resize_to(decoded, crops.shape[1], crops.shape[2], method)
+                for j in range(crops.shape[0]):
+                    out_tiles.append(color_correct(decoded[j:j + 1], crops[j:j + 1]))
+            pbar.update(len(chunk))
+
+        if not decode_once:
+            out = _untile_image(torch.cat(out_tiles, dim=0), ov_w * 8, ov_h * 8, rows, columns)
+        else:
+            stack = torch.cat(out_tiles, dim=0)
+            # Fold any axes between C and (H, W) (e.g. T of a 5-D latent) into
+            # the channels _untile_image blends over, then restore them.
+            folded = stack.reshape(stack.shape[0], -1, *stack.shape[-2:]).movedim(1, -1)
+            latent = _untile_image(folded, ov_w, ov_h, rows, columns).movedim(-1, 1)
+            latent = {"samples": latent.reshape(1, *stack.shape[1:-2], *latent.shape[-2:])}
+            if vae_decode_tiled:
+                from nodes import VAEDecodeTiled
+                out = VAEDecodeTiled().decode(vae, latent, tile_size=vae_decode_tile_size)[0]
+            else:
+                out = vae_decoder.decode(vae, latent)[0]
+            out = color_correct(out, img[:, :out.shape[1], :out.shape[2], :])
+        # The latent grid can drop up to a few 8 px cells at the edges: return
+        # the same size as the pixel-grid per_tile mode.
+        tile_px_h, tile_px_w, _, _ = _tile_size(h, w, rows, columns, overlap, overlap_x, overlap_y)
+        return _resize_to(out, rows * tile_px_h, columns * tile_px_w, method)
 
     def _run_multidiffusion(self, img, model, weights_path, vae, positive, negative,
                             seed, steps, cfg, sampler_name, scheduler, denoise,
                             strength, start_percent, end_percent, preserve_wrapper,
                             rows, columns, overlap, overlap_x, overlap_y,
                             vae_encoder, vae_decoder,
-                            vae_decode_tiled=False, vae_decode_tile_size=512):
+                            vae_decode_tiled=False, vae_decode_tile_size=512,
+                            tile_batch_size=1, shifted=False,
+                            freeze_threshold=0.0, freeze_refresh=4,
+                            vae_encode_tiled=False, vae_encode_tile_size=512):
         """MultiDiffusion: one sampler pass over the whole latent, tiling + LLLite
         applied per-tile and averaged in latent space at every denoising step.
 
         Tiles never run to completion independently, so they stay consistent and
-        there are no seams or double-exposures to blend away.
+        there are no seams or double-exposures to blend away. With ``shifted``
+        (SpotDiffusion) the tiles don't overlap; instead the grid is re-drawn
+        at a random offset every step.
         """
         from nodes import common_ksampler
-        from ._vendor.anima_lllite_apply import build_anima_lllite, prepare_cond_image
+        from ._vendor.anima_lllite_apply import (
+            get_anima_lllite,
+            install_lllite_patch,
+            offload_lllite,
+            prepare_cond_image,
+        )
 
-        lllite, patch_spatial, cond_in_channels, _ = build_anima_lllite(
+        lllite, patch_spatial, cond_in_channels, _ = get_anima_lllite(
             model, weights_path, strength
         )
         if cond_in_channels == 4:
@@ -419,41 +937,55 @@ class VSLinx_AnimaLLLiteTiledSampler:
 
         src_image = img.detach().clone()
 
-        # Encode the whole image once (ComfyUI auto-tiles the VAE if it would OOM).
-        latent = vae_encoder.encode(vae, img)[0]
+        # Encode the whole image once (ComfyUI auto-tiles the VAE if it would
+        # OOM; ``vae_encode_tiled`` tiles it up front instead).
+        latent = _md_encode(vae, vae_encoder, img, vae_encode_tiled, vae_encode_tile_size)
         x0 = latent["samples"]
         latent_h, latent_w = int(x0.shape[-2]), int(x0.shape[-1])
 
-        # Latent-space tile grid (covers the full latent; last tile reaches the edge).
-        tile_hl = max(1, latent_h // rows)
-        tile_wl = max(1, latent_w // columns)
-        ov_hl = 0 if rows == 1 else min(int(tile_hl * overlap) + overlap_y // 8, tile_hl // 2)
-        ov_wl = 0 if columns == 1 else min(int(tile_wl * overlap) + overlap_x // 8, tile_wl // 2)
-        ys = _md_spans(latent_h, rows, ov_hl)
-        xs = _md_spans(latent_w, columns, ov_wl)
-
-        state = {"tag": None, "tiles": None}
-
-        def build_tiles(device, dtype):
-            tiles = []
-            for i, (y0, y1) in enumerate(ys):
-                ty_l = (ys[i - 1][1] - y0) if i > 0 else 0
-                ty_r = (y1 - ys[i + 1][0]) if i < rows - 1 else 0
-                wy = _md_weight_1d(y1 - y0, ty_l, ty_r, device, dtype)
-                for j, (x0, x1) in enumerate(xs):
-                    tx_l = (xs[j - 1][1] - x0) if j > 0 else 0
-                    tx_r = (x1 - xs[j + 1][0]) if j < columns - 1 else 0
-                    wx = _md_weight_1d(x1 - x0, tx_l, tx_r, device, dtype)
-                    weight = wy[:, None] * wx[None, :]  # (th, tw)
-                    # control-image crop for this tile (latent box -> pixel box).
+        # Latent-space tile grid (covers the full latent; last tile reaches the
+        # edge). Batched tiles need one shared size, so lay the grid out uniformly.
+        ys, xs = _md_grid(latent_h, latent_w, rows, columns, overlap, overlap_x, overlap_y,
+                          uniform=tile_batch_size > 1)
+
+        # Freezing needs tiles that stay put between steps.
+        freezing = freeze_threshold > 0 and not shifted
+        state = {"tag": None, "tiles": None, "groups": None, "buffers": {}, "geoms": {},
+                 "conds": {}, "box_conds": {}, "freeze": _md_freeze_state()}
+
+        def add_conds(tiles, device, dtype):
+            for td in tiles:
+                y0, y1, x0, x1 = box = td["y0"], td["y1"], td["x0"], td["x1"]
+                # control-image crop for this tile (latent box -> pixel box),
+                # embedded once per box: shifted grids keep revisiting the same
+                # boxes, and the conditioning trunk never sees a box again.
+                cond = state["box_conds"].get(box)
+                if cond is None:
                     cond_crop = src_image[:, y0 * 8:y1 * 8, x0 * 8:x1 * 8, :]
-                    cond_pp = prepare_cond_image(
+                    cond = state["box_conds"][box] = lllite.encode_cond_image(prepare_cond_image(
                         cond_crop, y1 - y0, x1 - x0, device, dtype, patch_spatial
-                    )
-                    tiles.append({"y0": y0, "y1": y1, "x0": x0, "x1": x1,
-                                  "weight": weight, "cond": cond_pp})
+                    ))
+                td["cond"] = cond
             return tiles
 
+        def group_cond(group, partial=False):
+            # Static tiles keep their (concatenated) group embedding. Shifted
+            # groups change every step: hand LLLite a fresh tensor, so its
+            # per-embedding FiLM terms are dropped with the step instead of
+            # being kept for every box ever visited. Partly frozen groups
+            # aren't cached either (their tile set varies step to step).
+            if shifted:
+                return torch.cat([td["cond"] for td in group], dim=0)
+            if len(group) == 1:
+                return group[0]["cond"]
+            if partial:
+                return torch.cat([td["cond"] for td in group], dim=0)
+            key = tuple(td["idx"] for td in group)
+            cond = state["conds"].get(key)
+            if cond is None:
+                cond = state["conds"][key] = torch.cat([td["cond"] for td in group], dim=0)
+            return cond
+
         old_wrapper = model.model_options.get("model_function_wrapper")
 
         def call_model(apply_model, xt, t, c):
@@ -467,44 +999,91 @@ class VSLinx_AnimaLLLiteTiledSampler:
             c = args["c"]
             device, dtype = x_in.device, x_in.dtype
 
-            tag = (device, dtype)
+            # Blend weights and control crops only depend on the geometry:
+            # build them once per latent shape/device/dtype, not every step.
+            tag = (device, dtype, x_in.shape[-2], x_in.shape[-1])
+            if lllite.place(device, dtype):
+                # Moved onto the sampling device: embed the crops again there.
+                state["tag"] = None
             if state["tag"] != tag:
-                lllite.to(device=device, dtype=dtype)
-                state["tiles"] = build_tiles(device, dtype)
+                state["buffers"] = {}
+                state["geoms"] = {}
+                state["conds"] = {}
+                state["box_conds"] = {}
+                if not shifted:
+                    state["tiles"] = add_conds(_md_build_tiles(ys, xs, device, dtype), device, dtype)
+                    state["groups"] = _md_tile_groups(state["tiles"], tile_batch_size)
                 state["tag"] = tag
 
-            active = sigma_end <= float(t.max().item()) <= sigma_start
-
-            acc = torch.zeros_like(x_in)
-            lead = (1,) * (x_in.ndim - 2)
-            wsum = torch.zeros(lead + (x_in.shape[-2], x_in.shape[-1]),
-                               device=device, dtype=dtype)
-
-            for td in state["tiles"]:
-                y0, y1, x0, x1 = td["y0"], td["y1"], td["x0"], td["x1"]
-                x_tile = x_in[..., y0:y1, x0:x1]
+            sigma = float(t.max().item())
+            active = sigma_end <= sigma <= sigma_start
+            if shifted:
+                tiles = _md_shifted_tiles(latent_h, latent_w, rows, columns, seed, sigma)
+                groups = _md_tile_groups(add_conds(tiles, device, dtype), tile_batch_size)
+            else:
+                groups = state["groups"]
+            # LLLite switching on/off mid-run changes the prediction, so a tile
+            # frozen under one state must not be reused under the other.
+            key = _md_freeze_key(x_in, c) + (active,) if freezing else None
+
+            acc = _md_accumulator(state, x_in)
+
+            def call(xt, tt, cc):
+                return call_model(apply_model, xt, tt, cc)
+
+            for group in groups:
+                full = len(group)
+                if freezing:
+                    group, reuse = _md_freeze_split(state["freeze"], group, key, sigma, freeze_refresh)
+                    for td, eps in reuse:
+                        _md_scatter(acc, td, eps)
+                    if not group:
+                        continue
+                # Batched groups gather/scatter all their tiles in one indexing
+                # op. A partly frozen group takes the per-tile slice path: its
+                # tile set varies step to step and must not grow the caches.
+                partial = len(group) < full
+                geom = _md_group_geometry(state, group, x_in) if len(group) > 1 and not partial else None
                 if active:
+                    # One cond embedding per tile in the group; LLLite broadcasts
+                    # the (k, ...) cond over the (batch, k) tile stack.
                     lllite.set_multiplier(strength)
-                    lllite.set_cond_image(td["cond"])
-                    lllite.apply_to()
+                    lllite.set_cond_emb(group_cond(group, partial))
+                    if not persistent:
+                        lllite.apply_to()
                 try:
-                    eps = call_model(apply_model, x_tile, t, c)
+                    eps = _md_eval_group(call, x_in, t, c, group, geom)
                 finally:
                     if active:
-                        lllite.restore()
+                        if not persistent:
+                            lllite.restore()
                         lllite.clear_cond_image()
-                wb = td["weight"].view(lead + td["weight"].shape)
-                acc[..., y0:y1, x0:x1] += eps * wb
-                wsum[..., y0:y1, x0:x1] += wb
+                if freezing:
+                    for j, td in enumerate(group):
+                        _md_freeze_record(state["freeze"], td, key, eps[:, j], freeze_threshold)
+                _md_scatter_group(acc, group, eps, geom)
 
-            return acc / wsum.clamp(min=1e-6)
+            return acc
 
         m = model.clone()
         m.set_model_unet_function_wrapper(wrapper)
-        sampled = common_ksampler(
-            m, seed, steps, cfg, sampler_name, scheduler,
-            positive, negative, latent, denoise=denoise,
-        )[0]
+        # Patch the DiT once for the whole run; per group only the gate flips.
+        persistent = install_lllite_patch(m, lllite)
+        try:
+            sampled = common_ksampler(
+                m, seed, steps, cfg, sampler_name, scheduler,
+                positive, negative, latent, denoise=denoise,
+            )[0]
+        finally:
+            # The network is cached across runs: drop this run's tiles and
+            # park it off the sampling device (the OUTER_SAMPLE wrapper already
+            # does; this covers ComfyUI versions without it).
+            offload_lllite(lllite)
+        if freezing:
+            fr = state["freeze"]
+            total = fr["evals"] + fr["skipped"]
+            logger.info("[vsLinx] Anima MultiDiffusion tile freezing: skipped %d of %d tile evaluations (%.0f%%)",
+                        fr["skipped"], total, 100.0 * fr["skipped"] / max(1, total))
         if vae_decode_tiled:
             # Decode the full-image latent in tiles, so the final decode can't
             # spike VRAM (or, on Windows, spill into slow shared system memory).
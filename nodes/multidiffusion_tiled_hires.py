@@ -21,9 +21,303 @@ the Anima sampler so there is a single source of truth for it.
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
+import uuid
+
+import numpy as np
 import torch
 
-from .anima_lllite_tiled_sampler import _md_spans, _md_weight_1d
+from .anima_lllite_tiled_sampler import (
+    _md_accumulator,
+    _md_auto_grid,
+    _md_build_tiles,
+    _md_encode,
+    _md_eval_group,
+    _md_freeze_key,
+    _md_freeze_record,
+    _md_freeze_split,
+    _md_freeze_state,
+    _md_grid,
+    _md_group_geometry,
+    _md_scatter,
+    _md_scatter_group,
+    _md_shifted_tiles,
+    _md_tile_groups,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _checkpoint_path(directory, img, positive, negative, settings):
+    """Checkpoint file for one ``_run``: keyed by the image pixels, the
+    conditioning tensors and every sampler/grid setting that affects the
+    result, so only an identical rerun picks it up."""
+    h = hashlib.sha256(repr(settings).encode("utf-8"))
+    h.update(img.detach().to("cpu", torch.float32).contiguous().numpy().tobytes())
+    for cond in (positive, negative):
+        for t, _ in cond:
+            h.update(t.detach().to("cpu", torch.float32).contiguous().numpy().tobytes())
+    return os.path.join(directory, f"vslinx_md_{h.hexdigest()[:32]}.pt")
+
+
+def _checkpoint_load(path):
+    """Load a saved ``{"step", "samples"}`` checkpoint, or None if there is
+    none (or it can't be read)."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        ckpt = torch.load(path, map_location="cpu", weights_only=True)
+        return {"step": int(ckpt["step"]), "samples": ckpt["samples"]}
+    except Exception as e:
+        logger.warning("[vsLinx] MultiDiffusion: ignoring unreadable checkpoint %s (%s)", path, e)
+        return None
+
+
+def _checkpoint_usable(ckpt, samples, start_step):
+    """``ckpt`` if it can resume a run on ``samples`` that starts at
+    ``start_step`` (same latent shape, saved after that step), else None."""
+    if ckpt is None or ckpt["samples"].shape != samples.shape or ckpt["step"] <= start_step:
+        return None
+    return ckpt
+
+
+def _checkpoint_save(path, step, samples):
+    """Write atomically, so a crash mid-save never leaves a torn checkpoint."""
+    tmp = path + ".tmp"
+    torch.save({"step": step, "samples": samples}, tmp)
+    os.replace(tmp, path)
+
+
+def _offload_buffer(state, key, shape, dtype):
+    """Host buffer kept in ``state`` across steps. Page-locked when CUDA is
+    available, so device -> host copies into it can run asynchronously."""
+    buf = state["buffers"].get(key)
+    if buf is None or tuple(buf.shape) != tuple(shape) or buf.dtype != dtype:
+        buf = torch.empty(shape, dtype=dtype, pin_memory=torch.cuda.is_available())
+        state["buffers"][key] = buf
+    return buf
+
+
+def _offload_stage(state, eps, slot):
+    """Start copying a group's predictions into host staging buffer ``slot``.
+    Returns ``(host, event)``; the copy is done once ``event`` has fired.
+
+    On CUDA the copy runs on a side stream (kept in ``state``) that waits for
+    the compute stream, so it overlaps the next group's model call instead
+    of queueing behind it."""
+    host = _offload_buffer(state, ("stage", slot, tuple(eps.shape)), eps.shape, eps.dtype)
+    if not eps.is_cuda:
+        host.copy_(eps)
+        return host, None
+    compute = torch.cuda.current_stream(eps.device)
+    stream = state.get("copy_stream")
+    if stream is None or stream.device != eps.device:
+        stream = state["copy_stream"] = torch.cuda.Stream(device=eps.device)
+    stream.wait_stream(compute)
+    with torch.cuda.stream(stream):
+        host.copy_(eps, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record(stream)
+    # ``eps`` was allocated on the compute stream: keep its memory from being
+    # reused there until the side-stream copy has read it.
+    eps.record_stream(stream)
+    return host, event
+
+
+def _offload_flush(acc, pending, freeze=None, key=None, threshold=0.0):
+    """Fold a staged group's predictions into the host accumulator (and the
+    freeze cache), waiting for its copy to land first."""
+    group, host, event = pending
+    if event is not None:
+        event.synchronize()
+    for j, td in enumerate(group):
+        if freeze is not None:
+            _md_freeze_record(freeze, td, key, host[:, j], threshold)
+        _md_scatter(acc, td, host[:, j])
+
+
+# Pixels of context a streamed VAE tile sees past its own edges on each side.
+_STREAM_PAD = 64
+
+
+def _stream_spans(total, tile, pad):
+    """``(c0, c1, w0, w1)`` spans covering [0, total): cores of ``tile``
+    units, each with a window padded by ``pad`` units of context per side."""
+    return [(c0, min(total, c0 + tile), max(0, c0 - pad), min(total, c0 + tile + pad))
+            for c0 in range(0, total, tile)]
+
+
+def _stream_open(path):
+    """Open the source image at ``path`` for windowed reads.
+
+    Returns ``(read, height, width, image)``; ``read(y0, y1, x0, x1)`` gives
+    that window as uint8 RGB. Uncompressed 8-bit RGB files (binary ``.ppm``,
+    uncompressed ``.tif``) are memory-mapped, so only the windows being read
+    are ever in RAM. Other formats can't be decoded piecewise: PIL decodes
+    them once on the first read and windows are cropped from that. PIL's
+    decompression-bomb limit is lifted for this trusted user path, since
+    oversized images are what this node is for. Close ``image`` when done.
+    """
+    from PIL import Image
+
+    limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        im = Image.open(path)
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+    w, h = im.size
+
+    row = w * 3
+    base = None
+    for tile in im.tile if im.mode == "RGB" else ():
+        codec, extents, offset, args = tuple(tile)[:4]
+        args = args if isinstance(args, tuple) else (args,)
+        x0, y0, x1, y1 = extents
+        if (codec != "raw" or args[0] != "RGB" or (x0, x1) != (0, w)
+                or (len(args) > 1 and args[1] not in (0, row))
+                or (len(args) > 2 and args[2] != 1)):
+            base = None
+            break
+        if base is None:
+            base = offset - y0 * row
+        if offset != base + y0 * row:
+            base = None
+            break
+    if base is not None and base >= 0:
+        pixels = np.memmap(path, dtype=np.uint8, mode="r", offset=base, shape=(h, w, 3))
+        return (lambda y0, y1, x0, x1: pixels[y0:y1, x0:x1]), h, w, im
+
+    def read(y0, y1, x0, x1):
+        return np.asarray(im.crop((x0, y0, x1, y1)).convert("RGB"))
+
+    return read, h, w, im
+
+
+def _stream_encode(vae, read, h, w, tile, path):
+    """VAE-encode an (h, w) image tile by tile into a float32 ``.npy`` memmap
+    at ``path``; ``read(y0, y1, x0, x1)`` supplies each uint8 RGB window.
+    Every tile is encoded with ``_STREAM_PAD`` pixels of context and only its
+    core is kept, so borders see their neighbours."""
+    latent = None
+    for y0, y1, wy0, wy1 in _stream_spans(h, tile, _STREAM_PAD):
+        for x0, x1, wx0, wx1 in _stream_spans(w, tile, _STREAM_PAD):
+            px = torch.from_numpy(np.ascontiguousarray(read(wy0, wy1, wx0, wx1)))
+            enc = vae.encode(px.unsqueeze(0).float() / 255.0).to("cpu", torch.float32)
+            if latent is None:
+                # Leading axes as the VAE returns them: (1, C) or (1, C, T).
+                latent = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=np.float32, shape=tuple(enc.shape[:-2]) + (h // 8, w // 8))
+            ty, tx = (y0 - wy0) // 8, (x0 - wx0) // 8
+            latent[..., y0 // 8:y1 // 8, x0 // 8:x1 // 8] = \
+                enc[..., ty:ty + (y1 - y0) // 8, tx:tx + (x1 - x0) // 8].numpy()
+    latent.flush()
+    return latent
+
+
+def _stream_decode(vae, samples, tile, path, work_path):
+    """VAE-decode ``samples`` one row of tiles at a time and write each pixel
+    strip to ``path`` as soon as it's done.
+
+    ``.ppm``/``.pnm`` outputs are written straight to the file, so only one
+    strip is ever in RAM. Other formats are assembled in a uint8 memmap at
+    ``work_path`` and saved with PIL at the end, which needs one 8-bit copy
+    of the image in RAM for the final encode.
+    """
+    from PIL import Image
+
+    lh, lw = samples.shape[-2], samples.shape[-1]
+    h, w = lh * 8, lw * 8
+    streamed = os.path.splitext(path)[1].lower() in (".ppm", ".pnm")
+    if streamed:
+        out = open(path, "wb")
+        out.write(b"P6\n%d %d\n255\n" % (w, h))
+    else:
+        out = np.lib.format.open_memmap(work_path, mode="w+", dtype=np.uint8, shape=(h, w, 3))
+    try:
+        lt, lp = max(1, tile // 8), _STREAM_PAD // 8
+        for y0, y1, wy0, wy1 in _stream_spans(lh, lt, lp):
+            strip = np.empty(((y1 - y0) * 8, w, 3), dtype=np.uint8)
+            for x0, x1, wx0, wx1 in _stream_spans(lw, lt, lp):
+                img = vae.decode(samples[..., wy0:wy1, wx0:wx1])
+                img = img.reshape((-1,) + tuple(img.shape[-3:]))[0]
+                ty, tx = (y0 - wy0) * 8, (x0 - wx0) * 8
+                core = img[ty:ty + (y1 - y0) * 8, tx:tx + (x1 - x0) * 8, :3]
+                # Same 8-bit conversion as ComfyUI's SaveImage.
+                strip[:, x0 * 8:x1 * 8] = (255.0 * core).clamp(0, 255).to(torch.uint8).cpu().numpy()
+            if streamed:
+                out.write(strip.tobytes())
+            else:
+                out[y0 * 8:y1 * 8] = strip
+        if not streamed:
+            out.flush()
+            Image.fromarray(np.asarray(out)).save(path)
+    finally:
+        if streamed:
+            out.close()
+        else:
+            del out
+
+
+def _sample_checkpointed(model, seed, steps, cfg, sampler_name, scheduler,
+                         positive, negative, latent, denoise, path, interval, state,
+                         start_step=0, ckpt=None):
+    """``common_ksampler`` with resumable progress: every ``interval`` steps
+    the current latent is saved to ``path``, and ``ckpt`` (a checkpoint the
+    caller loaded from ``path`` and validated with ``_checkpoint_usable``) is
+    picked up again at its step with no fresh noise. The file is removed once
+    sampling finishes. A nonzero ``start_step`` starts a fresh run part-way
+    into the schedule, as ``common_ksampler`` would."""
+    import comfy.sample
+    import comfy.utils
+    import latent_preview
+
+    start = start_step
+    if ckpt is not None:
+        start = ckpt["step"]
+        latent = dict(latent, samples=ckpt["samples"])
+        logger.info("[vsLinx] MultiDiffusion: resuming from checkpoint at step %d (%s)", start, path)
+
+    latent_image = comfy.sample.fix_empty_latent_channels(model, latent["samples"])
+    if ckpt is not None:
+        noise = torch.zeros(latent_image.size(), dtype=latent_image.dtype,
+                            layout=latent_image.layout, device="cpu")
+    else:
+        noise = comfy.sample.prepare_noise(latent_image, seed, latent.get("batch_index"))
+
+    model_sampling = model.get_model_object("model_sampling")
+    preview = latent_preview.prepare_callback(model, steps)
+
+    def callback(i, x0, x, total):
+        step = start + i
+        if preview is not None:
+            preview(step, x0, x, start + total)
+        # The wrapper's schedule is already cut at ``start``, so index it by i.
+        sigmas = state.get("sigmas")
+        if i == 0 or step % interval or sigmas is None or i >= len(sigmas) - 1:
+            return
+        # ``x`` is the sampler state at sigmas[i], in the model's internal
+        # latent space; undo the noise scaling the sampler applies to its
+        # input so passing it back in as the latent reproduces ``x`` exactly.
+        saved = model_sampling.inverse_noise_scaling(sigmas[i].to(x.device), x)
+        saved = model.model.process_latent_out(saved).to("cpu", torch.float32)
+        _checkpoint_save(path, step, saved)
+
+    samples = comfy.sample.sample(
+        model, noise, steps, cfg, sampler_name, scheduler, positive, negative, latent_image,
+        denoise=denoise, disable_noise=ckpt is not None, start_step=start or None,
+        noise_mask=latent.get("noise_mask"), callback=callback,
+        disable_pbar=not comfy.utils.PROGRESS_BAR_ENABLED, seed=seed,
+    )
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    out = latent.copy()
+    out["samples"] = samples
+    return out
 
 
 class VSLinx_MultiDiffusionTiledHiresFix:
@@ -61,11 +355,43 @@ class VSLinx_MultiDiffusionTiledHiresFix:
                     "tooltip": "Decode the final full-image latent in tiles instead of one pass, to avoid a single huge VAE decode that can spike VRAM (or, on Windows, spill into slow shared system memory). The decode is a single full-image pass independent of rows/columns, so adding tiles won't shrink it - enable this instead."}),
                 "vae_decode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32,
                     "tooltip": "Tile size in pixels for the tiled VAE decode."}),
+                "tile_batch_size": ("INT", {"default": 1, "min": 1, "max": 256, "step": 1,
+                    "tooltip": "How many same-sized tiles to run through the model in one call each step. 1 evaluates tiles one at a time (lowest VRAM). Higher values stack tiles along the batch dimension for better GPU utilisation on fine grids, at the cost of tile_batch_size x the per-tile activation VRAM; the grid is then laid out with uniform tile sizes so every tile can share a batch."}),
+                "batch_images": ("BOOLEAN", {"default": False,
+                    "tooltip": "Sample all images of an input batch together in one pass (one VAE encode, one sampler run, one decode) instead of one after another. Faster on image batches, but each step holds every image's tiles at once, so peak VRAM grows with the batch size. Every image starts from the noise it would get on its own, so deterministic samplers (e.g. euler) reproduce the per-image results; ancestral/SDE samplers draw their per-step noise for the whole batch, so batched images after the first come out slightly different."}),
+                "grid_mode": (["manual", "auto"], {"default": "manual",
+                    "tooltip": "manual: use rows/columns as set. auto: pick the fewest tiles whose per-step model activations fit the free VRAM (with a safety margin), from the model's own memory estimate - rows/columns are then ignored. The chosen grid is logged and returned on the rows/columns outputs."}),
+                "sampling_mode": (["multidiffusion", "spotdiffusion"], {"default": "multidiffusion",
+                    "tooltip": "multidiffusion: overlapping tiles averaged in latent space every step. spotdiffusion: non-overlapping tiles whose grid is shifted by a random offset every step, so seams average out over time - each step costs about one untiled full-image evaluation since no latent pixel is processed twice (the overlap fields are not used)."}),
+                "freeze_threshold": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1.0, "step": 0.001,
+                    "tooltip": "(multidiffusion only) Per-tile convergence freezing. When a tile's prediction changes by less than this fraction between steps, its cached prediction is reused instead of calling the model for it, until the next refresh. Saves compute on flat areas (sky, backgrounds) in low-denoise refines. 0 = off. Try 0.01-0.05."}),
+                "freeze_refresh": ("INT", {"default": 4, "min": 1, "max": 1000, "step": 1,
+                    "tooltip": "(multidiffusion only) A frozen tile is re-evaluated every this many steps, so it can thaw if it starts changing again."}),
+                "checkpoint_dir": ("STRING", {"default": "",
+                    "tooltip": "Optional folder for resumable checkpoints. When set, the current latent is saved there every checkpoint_interval steps, and a rerun with the same image, prompts, seed and sampler/grid settings resumes from the last checkpoint instead of starting over (e.g. after an OOM, cancel or restart). The file is deleted once the image finishes. Empty = off."}),
+                "checkpoint_interval": ("INT", {"default": 5, "min": 1, "max": 10000, "step": 1,
+                    "tooltip": "Save a checkpoint every this many steps (only used when checkpoint_dir is set)."}),
+                "vae_encode_tiled": ("BOOLEAN", {"default": False,
+                    "tooltip": "Encode the input image in tiles instead of one pass, so the initial VAE encode of a very large image can't spike VRAM (ComfyUI otherwise only falls back to tiling after an out-of-memory error). With vae_decode_tiled also on, peak VRAM stays tile-sized for the whole node."}),
+                "vae_encode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32,
+                    "tooltip": "Tile size in pixels for the tiled VAE encode."}),
+                "offload_latent": ("BOOLEAN", {"default": False,
+                    "tooltip": "Keep the MultiDiffusion accumulator, the tile blend weights and the frozen-tile cache in (pinned) system RAM instead of VRAM. Only the active tiles live on the GPU; each group's prediction is copied back while the next group runs. Frees several full-latent buffers of VRAM on very large images, at some speed cost."}),
+                "progressive_split": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 0.9, "step": 0.05,
+                    "tooltip": "Coarse-to-fine schedule. Run this fraction of the steps on a downscaled latent with a proportionally smaller grid, then upscale the predicted result and finish the remaining steps at full size. The high-noise steps only shape low-frequency structure, so this cuts model work substantially on large refines. 0 = off."}),
+                "progressive_scale": ("FLOAT", {"default": 0.5, "min": 0.25, "max": 0.9, "step": 0.05,
+                    "tooltip": "Size of the coarse stage relative to the full latent (rows/columns shrink by the same factor, so the tiles keep their size)."}),
+                "progressive_upscale_method": (["bicubic", "bislerp", "bilinear", "nearest-exact", "area"], {"default": "bicubic",
+                    "tooltip": "How the coarse stage's result is upscaled to full size before the fine stage."}),
+                "late_overlap_scale": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 1.0, "step": 0.05,
+                    "tooltip": "(multidiffusion only) Sigma-dependent grid. Seams form at high noise; late steps need little overlap. From late_overlap_start on, the tile overlap (overlap, overlap_x, overlap_y) is multiplied by this, so late steps evaluate fewer model tokens. 1 = same overlap for every step (off)."}),
+                "late_overlap_start": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.05,
+                    "tooltip": "(multidiffusion only) Fraction of the steps after which the reduced late_overlap_scale overlap is used."}),
             },
         }
 
-    RETURN_TYPES = ("IMAGE",)
-    RETURN_NAMES = ("image",)
+    RETURN_TYPES = ("IMAGE", "INT", "INT", "LATENT")
+    RETURN_NAMES = ("image", "rows", "columns", "latent")
     FUNCTION = "execute"
     CATEGORY = "vsLinx/sampling"
     DESCRIPTION = (
@@ -93,64 +419,163 @@ class VSLinx_MultiDiffusionTiledHiresFix:
     def execute(self, image, model, positive, negative, vae,
                 seed, steps, cfg, sampler_name, scheduler, denoise,
                 rows, columns, overlap, overlap_x, overlap_y,
-                vae_decode_tiled=False, vae_decode_tile_size=512):
-        import comfy.utils
+                vae_decode_tiled=False, vae_decode_tile_size=512,
+                tile_batch_size=1, batch_images=False, grid_mode="manual",
+                sampling_mode="multidiffusion", freeze_threshold=0.0, freeze_refresh=4,
+                checkpoint_dir="", checkpoint_interval=5,
+                vae_encode_tiled=False, vae_encode_tile_size=512, offload_latent=False,
+                progressive_split=0.0, progressive_scale=0.5, progressive_upscale_method="bicubic",
+                late_overlap_scale=1.0, late_overlap_start=0.5):
         from nodes import VAEEncode, VAEDecode
 
         vae_encoder = VAEEncode()
         vae_decoder = VAEDecode()
-        batch_size = image.shape[0]
+
+        def run(sl, rows, columns):
+            img = image[sl]
+            # Encode the whole image once (ComfyUI auto-tiles the VAE if it would
+            # OOM; ``vae_encode_tiled`` tiles it up front instead).
+            latent = _md_encode(vae, vae_encoder, img, vae_encode_tiled, vae_encode_tile_size)
+            sampled = self._run(
+                latent, img, model, positive, negative,
+                seed, steps, cfg, sampler_name, scheduler, denoise,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, sampling_mode, freeze_threshold, freeze_refresh,
+                checkpoint_dir, checkpoint_interval, offload_latent,
+                progressive_split, progressive_scale, progressive_upscale_method,
+                late_overlap_scale, late_overlap_start,
+            )
+            if vae_decode_tiled:
+                # Decode the full-image latent in tiles, so the final decode can't
+                # spike VRAM (or, on Windows, spill into slow shared system memory).
+                from nodes import VAEDecodeTiled
+                decoded = VAEDecodeTiled().decode(vae, sampled, tile_size=vae_decode_tile_size)[0]
+            else:
+                decoded = vae_decoder.decode(vae, sampled)[0]
+            return decoded, sampled["samples"]
+
+        rows, columns, results = self._refine(
+            run, image.shape[0], image.shape[1] // 8, image.shape[2] // 8,
+            model, cfg, rows, columns, overlap, overlap_x, overlap_y,
+            tile_batch_size, batch_images, grid_mode, sampling_mode,
+        )
+        images, latents = zip(*results)
+        return (torch.cat(images, dim=0), rows, columns, {"samples": torch.cat(latents, dim=0)})
+
+    def _refine(self, run, batch_size, latent_h, latent_w, model, cfg,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, batch_images, grid_mode, sampling_mode="multidiffusion"):
+        """Resolve the grid (``auto`` mode), then call ``run(slice, rows, columns)``
+        once per image of the batch - or once for all of it with
+        ``batch_images``. Returns the grid used and the list of results."""
+        import comfy.utils
+
+        if grid_mode == "auto":
+            # cond + uncond share a call unless cfg is 1 (uncond is skipped).
+            call_batch = (1 if cfg == 1.0 else 2) * tile_batch_size
+            if batch_images:
+                call_batch *= batch_size
+            rows, columns, th, tw, fits = _md_auto_grid(
+                model, latent_h, latent_w,
+                overlap, overlap_x, overlap_y, call_batch, uniform=tile_batch_size > 1,
+                shifted=sampling_mode == "spotdiffusion",
+            )
+            if fits:
+                logger.info("[vsLinx] MultiDiffusion auto grid: %d x %d (tiles up to %dx%d px)",
+                            rows, columns, tw * 8, th * 8)
+            else:
+                logger.warning("[vsLinx] MultiDiffusion auto grid: no grid fits the free VRAM; "
+                               "using the finest allowed grid %d x %d (tiles up to %dx%d px)",
+                               rows, columns, tw * 8, th * 8)
 
         pbar = comfy.utils.ProgressBar(batch_size)
+        if batch_images and batch_size > 1:
+            # One pass for the whole batch: sampler setup, model loading and
+            # the sigma schedule are paid once instead of once per image.
+            results = [run(slice(None), rows, columns)]
+            pbar.update(batch_size)
+            return rows, columns, results
+
         results = []
         for b in range(batch_size):
-            results.append(self._run(
-                image[b:b + 1], model, vae, positive, negative,
-                seed, steps, cfg, sampler_name, scheduler, denoise,
-                rows, columns, overlap, overlap_x, overlap_y,
-                vae_encoder, vae_decoder,
-                vae_decode_tiled, vae_decode_tile_size,
-            ))
+            results.append(run(slice(b, b + 1), rows, columns))
             pbar.update(1)
-        return (torch.cat(results, dim=0),)
+        return rows, columns, results
 
-    def _run(self, img, model, vae, positive, negative,
+    def _run(self, latent, source, model, positive, negative,
              seed, steps, cfg, sampler_name, scheduler, denoise,
              rows, columns, overlap, overlap_x, overlap_y,
-             vae_encoder, vae_decoder,
-             vae_decode_tiled=False, vae_decode_tile_size=512):
+             tile_batch_size=1, sampling_mode="multidiffusion",
+             freeze_threshold=0.0, freeze_refresh=4,
+             checkpoint_dir="", checkpoint_interval=5, offload_latent=False,
+             progressive_split=0.0, progressive_scale=0.5, progressive_upscale_method="bicubic",
+             late_overlap_scale=1.0, late_overlap_start=0.5):
         """One MultiDiffusion pass over the whole latent: tile + overlap-average
-        the model's prediction at every denoising step."""
+        the model's prediction at every denoising step. In ``spotdiffusion``
+        mode the tiles don't overlap and the grid moves every step instead.
+
+        ``source`` (the input image or latent) only keys the checkpoint file.
+        With ``offload_latent`` the accumulator, blend weights and freeze cache
+        live in host memory and only the active tiles are on the device. A
+        ``progressive_split`` runs the first steps on a downscaled latent, and
+        ``late_overlap_scale`` < 1 switches to a smaller overlap for the late
+        steps. Returns the sampled LATENT."""
+        import comfy.samplers
+        import comfy.utils
         from nodes import common_ksampler
 
-        # Encode the whole image once (ComfyUI auto-tiles the VAE if it would OOM).
-        latent = vae_encoder.encode(vae, img)[0]
+        ckpt_path = None
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            ckpt_path = _checkpoint_path(checkpoint_dir, source, positive, negative, (
+                seed, steps, cfg, sampler_name, scheduler, denoise,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, sampling_mode, freeze_threshold, freeze_refresh,
+                progressive_split, progressive_scale, progressive_upscale_method,
+                late_overlap_scale, late_overlap_start,
+            ))
+
+        latent = dict(latent)
         x0 = latent["samples"]
         latent_h, latent_w = int(x0.shape[-2]), int(x0.shape[-1])
-
-        # Latent-space tile grid (covers the full latent; last tile reaches the edge).
-        tile_hl = max(1, latent_h // rows)
-        tile_wl = max(1, latent_w // columns)
-        ov_hl = 0 if rows == 1 else min(int(tile_hl * overlap) + overlap_y // 8, tile_hl // 2)
-        ov_wl = 0 if columns == 1 else min(int(tile_wl * overlap) + overlap_x // 8, tile_wl // 2)
-        ys = _md_spans(latent_h, rows, ov_hl)
-        xs = _md_spans(latent_w, columns, ov_wl)
-
-        state = {"tag": None, "tiles": None}
-
-        def build_tiles(device, dtype):
-            tiles = []
-            for i, (y0, y1) in enumerate(ys):
-                ty_l = (ys[i - 1][1] - y0) if i > 0 else 0
-                ty_r = (y1 - ys[i + 1][0]) if i < rows - 1 else 0
-                wy = _md_weight_1d(y1 - y0, ty_l, ty_r, device, dtype)
-                for j, (x0, x1) in enumerate(xs):
-                    tx_l = (xs[j - 1][1] - x0) if j > 0 else 0
-                    tx_r = (x1 - xs[j + 1][0]) if j < columns - 1 else 0
-                    wx = _md_weight_1d(x1 - x0, tx_l, tx_r, device, dtype)
-                    weight = wy[:, None] * wx[None, :]  # (th, tw)
-                    tiles.append({"y0": y0, "y1": y1, "x0": x0, "x1": x1, "weight": weight})
-            return tiles
+        if x0.shape[0] > 1:
+            # Draw every image's starting noise from batch index 0 of ``seed``,
+            # i.e. the noise it gets when sampled on its own. Deterministic
+            # samplers then reproduce the per-image results; ancestral/SDE
+            # samplers draw their per-step noise for the whole batch, so
+            # images after the first differ slightly.
+            latent["batch_index"] = [0] * int(x0.shape[0])
+
+        # rows x columns per latent size the sampler will run at. The coarse
+        # stage of a progressive run shrinks the grid with the latent, so its
+        # tiles keep the full-size tile dimensions.
+        plans = {(latent_h, latent_w): (rows, columns)}
+        split = 0
+        if progressive_split > 0 and steps > 1:
+            split = min(steps - 1, max(1, int(round(steps * progressive_split))))
+            coarse_h = max(1, int(round(latent_h * progressive_scale)))
+            coarse_w = max(1, int(round(latent_w * progressive_scale)))
+            plans[(coarse_h, coarse_w)] = (max(1, int(round(rows * progressive_scale))),
+                                          max(1, int(round(columns * progressive_scale))))
+
+        shifted = sampling_mode == "spotdiffusion"
+        # Freezing needs tiles that stay put between steps.
+        freezing = freeze_threshold > 0 and not shifted
+        # Sigma-dependent grid: steps from ``late_step`` on (sigma at or below
+        # ``late_sigma``) use the reduced overlap. Each step range gets its own
+        # cached tile layout.
+        late_sigma = None
+        if late_overlap_scale < 1.0 and not shifted:
+            late_step = min(steps, int(round(steps * late_overlap_start)))
+            schedule = comfy.samplers.KSampler(
+                model, steps=steps, device=model.load_device, sampler=sampler_name,
+                scheduler=scheduler, denoise=denoise, model_options=model.model_options,
+            ).sigmas
+            late_sigma = float(schedule[late_step]) * (1.0 + 1e-4)
+            ranges = ((0, late_step), (late_step, steps))
+
+        state = {"tag": None, "grid": None, "layouts": {}, "layout": None, "buffers": {},
+                 "geoms": {}, "freeze": _md_freeze_state(), "sigmas": None}
 
         # Delegate to any wrapper already installed upstream so this node can
         # stack with other model_function_wrapper nodes instead of clobbering them.
@@ -167,45 +592,331 @@ class VSLinx_MultiDiffusionTiledHiresFix:
             c = args["c"]
             device, dtype = x_in.device, x_in.dtype
 
-            tag = (device, dtype)
+            # Blend weights only depend on the geometry: build (and normalise)
+            # them once per latent shape/device/dtype, not every step.
+            tag = (device, dtype, x_in.shape[-2], x_in.shape[-1])
             if state["tag"] != tag:
-                state["tiles"] = build_tiles(device, dtype)
+                h, w = int(x_in.shape[-2]), int(x_in.shape[-1])
+                state["grid"] = (h, w) + plans.get((h, w), (rows, columns))
+                state["layouts"] = {}
+                state["buffers"] = {}
                 state["tag"] = tag
 
-            acc = torch.zeros_like(x_in)
-            lead = (1,) * (x_in.ndim - 2)
-            wsum = torch.zeros(lead + (x_in.shape[-2], x_in.shape[-1]),
-                               device=device, dtype=dtype)
-
-            for td in state["tiles"]:
-                y0, y1, x0, x1 = td["y0"], td["y1"], td["x0"], td["x1"]
-                x_tile = x_in[..., y0:y1, x0:x1]
-                eps = call_model(apply_model, x_tile, t, c)
-                wb = td["weight"].view(lead + td["weight"].shape)
-                acc[..., y0:y1, x0:x1] += eps * wb
-                wsum[..., y0:y1, x0:x1] += wb
-
-            return acc / wsum.clamp(min=1e-6)
+            if ckpt_path is not None and state["sigmas"] is None:
+                # The full schedule, to map a checkpointed step back to its sigma.
+                state["sigmas"] = c.get("transformer_options", {}).get("sample_sigmas")
+
+            sigma = float(t.max().item())
+            if shifted:
+                tiles = _md_shifted_tiles(*state["grid"], seed, sigma)
+                groups = _md_tile_groups(tiles, tile_batch_size)
+            else:
+                late = late_sigma is not None and sigma <= late_sigma
+                span = ranges[late] if late_sigma is not None else (0, steps)
+                layout = state["layouts"].get(span)
+                if layout is None:
+                    h, w, r, cols = state["grid"]
+                    f = late_overlap_scale if late else 1.0
+                    # Latent-space tile grid (covers the full latent; last tile
+                    # reaches the edge). Batched tiles need one shared size, so
+                    # lay the grid out uniformly.
+                    ys, xs = _md_grid(h, w, r, cols, overlap * f, int(overlap_x * f), int(overlap_y * f),
+                                      uniform=tile_batch_size > 1)
+                    # Offloaded weights are only ever applied on the host.
+                    tiles = _md_build_tiles(ys, xs, "cpu" if offload_latent else device, dtype)
+                    layout = state["layouts"][span] = {
+                        "groups": _md_tile_groups(tiles, tile_batch_size), "geoms": {},
+                    }
+                if state["layout"] is not layout:
+                    # Cached predictions belong to the previous layout's tiles.
+                    state["freeze"]["cache"].clear()
+                    state["layout"] = layout
+                state["geoms"] = layout["geoms"]
+                groups = layout["groups"]
+            key = _md_freeze_key(x_in, c) if freezing else None
+
+            if offload_latent:
+                acc = _offload_buffer(state, ("acc",), x_in.shape, dtype).zero_()
+            else:
+                acc = _md_accumulator(state, x_in)
+
+            def call(xt, tt, cc):
+                return call_model(apply_model, xt, tt, cc)
+
+            pending = None
+            # Host staging slot; only advances when a group is actually staged
+            # (frozen groups are skipped), so it never lands on ``pending``'s.
+            slot = 0
+            for group in groups:
+                full = len(group)
+                if freezing:
+                    group, reuse = _md_freeze_split(state["freeze"], group, key, sigma, freeze_refresh)
+                    for td, eps in reuse:
+                        _md_scatter(acc, td, eps)
+                    if not group:
+                        continue
+                # Batched groups gather/scatter all their tiles in one indexing
+                # op. A partly frozen group takes the per-tile slice path: its
+                # tile set varies step to step and must not grow the caches.
+                partial = len(group) < full
+                geom = _md_group_geometry(state, group, x_in) if len(group) > 1 and not partial else None
+                eps = _md_eval_group(call, x_in, t, c, group, geom)
+                if offload_latent:
+                    # Double-buffered: queue this group's copy to the host, then
+                    # fold the previous group in on the CPU while the GPU runs.
+                    staged = _offload_stage(state, eps, slot % 2)
+                    slot += 1
+                    if pending is not None:
+                        _offload_flush(acc, pending, state["freeze"] if freezing else None,
+                                       key, freeze_threshold)
+                    pending = (group,) + staged
+                    continue
+                if freezing:
+                    for j, td in enumerate(group):
+                        _md_freeze_record(state["freeze"], td, key, eps[:, j], freeze_threshold)
+                _md_scatter_group(acc, group, eps, geom)
+
+            if offload_latent:
+                if pending is not None:
+                    _offload_flush(acc, pending, state["freeze"] if freezing else None,
+                                   key, freeze_threshold)
+                # Blocking copy: the host buffer is zeroed again next step.
+                return acc.to(device)
+            return acc
 
         m = model.clone()
         m.set_model_unet_function_wrapper(wrapper)
-        sampled = common_ksampler(
-            m, seed, steps, cfg, sampler_name, scheduler,
-            positive, negative, latent, denoise=denoise,
-        )[0]
 
-        if vae_decode_tiled:
-            # Decode the full-image latent in tiles, so the final decode can't
-            # spike VRAM (or, on Windows, spill into slow shared system memory).
-            from nodes import VAEDecodeTiled
-            return VAEDecodeTiled().decode(vae, sampled, tile_size=vae_decode_tile_size)[0]
-        return vae_decoder.decode(vae, sampled)[0]
+        start_step = 0
+        # Load and validate the checkpoint up front: only a usable one (saved
+        # in the fine stage, past ``split``) may replace the coarse stage.
+        ckpt = None
+        if ckpt_path is not None:
+            ckpt = _checkpoint_usable(_checkpoint_load(ckpt_path), x0, split)
+        if split and ckpt is None:
+            coarse = dict(latent, samples=comfy.utils.common_upscale(
+                x0, coarse_w, coarse_h, "area", "disabled"))
+            # Stop after ``split`` steps, fully denoised: the sampler's last
+            # step then lands on its clean prediction at that point.
+            coarse = common_ksampler(
+                m, seed, steps, cfg, sampler_name, scheduler,
+                positive, negative, coarse, denoise=denoise,
+                last_step=split, force_full_denoise=True,
+            )[0]
+            # The fine stage re-noises the upscaled prediction to the sigma at
+            # ``split`` and finishes the schedule from there.
+            latent["samples"] = comfy.utils.common_upscale(
+                coarse["samples"], latent_w, latent_h, progressive_upscale_method, "disabled")
+            start_step = split
+            state["sigmas"] = None
+        elif split:
+            start_step = split
+
+        if ckpt_path is not None:
+            sampled = _sample_checkpointed(
+                m, seed, steps, cfg, sampler_name, scheduler,
+                positive, negative, latent, denoise, ckpt_path, checkpoint_interval, state,
+                start_step=start_step, ckpt=ckpt,
+            )
+        else:
+            sampled = common_ksampler(
+                m, seed, steps, cfg, sampler_name, scheduler,
+                positive, negative, latent, denoise=denoise,
+                start_step=start_step or None,
+            )[0]
+
+        if freezing:
+            fr = state["freeze"]
+            total = fr["evals"] + fr["skipped"]
+            logger.info("[vsLinx] MultiDiffusion tile freezing: skipped %d of %d tile evaluations (%.0f%%)",
+                        fr["skipped"], total, 100.0 * fr["skipped"] / max(1, total))
+        return sampled
+
+
+# Inputs of the image node that only concern the VAE round-trip.
+_IMAGE_ONLY_INPUTS = ("image", "vae", "vae_decode_tiled", "vae_decode_tile_size",
+                      "vae_encode_tiled", "vae_encode_tile_size")
+
+
+# Inputs of the image node the streaming node replaces with file paths.
+_STREAM_REPLACED_INPUTS = _IMAGE_ONLY_INPUTS + ("batch_images",)
+
+
+class VSLinx_MultiDiffusionTiledHiresFixLatent(VSLinx_MultiDiffusionTiledHiresFix):
+    """The MultiDiffusion hires fix on a LATENT instead of an IMAGE, so several
+    refine passes (or a latent upscaler in between) can be chained without a
+    VAE decode/encode round-trip between them."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        types = super().INPUT_TYPES()
+        required = {"latent": ("LATENT", {"tooltip": "The (already-upscaled) latent to refine in tiles."})}
+        required.update((k, v) for k, v in types["required"].items() if k not in _IMAGE_ONLY_INPUTS)
+        return {"required": required}
+
+    RETURN_TYPES = ("LATENT", "INT", "INT")
+    RETURN_NAMES = ("latent", "rows", "columns")
+    DESCRIPTION = (
+        "Latent-in / latent-out version of the MultiDiffusion Tiled Hires Fix. "
+        "Refines a latent with seam-free tiled sampling and returns the latent, "
+        "so multi-stage hires pipelines can stay in latent space and skip the "
+        "VAE decode/encode between stages."
+    )
+    SEARCH_ALIASES = [
+        "hires fix latent",
+        "latent hires fix",
+        "multidiffusion latent",
+        "tiled diffusion latent",
+        "tiled ksampler latent",
+    ]
+
+    def execute(self, latent, model, positive, negative,
+                seed, steps, cfg, sampler_name, scheduler, denoise,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size=1, batch_images=False, grid_mode="manual",
+                sampling_mode="multidiffusion", freeze_threshold=0.0, freeze_refresh=4,
+                checkpoint_dir="", checkpoint_interval=5, offload_latent=False,
+                progressive_split=0.0, progressive_scale=0.5, progressive_upscale_method="bicubic",
+                late_overlap_scale=1.0, late_overlap_start=0.5):
+        samples = latent["samples"]
+        mask = latent.get("noise_mask")
+
+        def run(sl, rows, columns):
+            part = {"samples": samples[sl]}
+            if mask is not None:
+                # A single mask is shared by the whole batch; otherwise slice it too.
+                part["noise_mask"] = mask if mask.shape[0] == 1 else mask[sl]
+            sampled = self._run(
+                part, part["samples"], model, positive, negative,
+                seed, steps, cfg, sampler_name, scheduler, denoise,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, sampling_mode, freeze_threshold, freeze_refresh,
+                checkpoint_dir, checkpoint_interval, offload_latent,
+                progressive_split, progressive_scale, progressive_upscale_method,
+                late_overlap_scale, late_overlap_start,
+            )
+            return sampled["samples"]
+
+        rows, columns, results = self._refine(
+            run, samples.shape[0], samples.shape[-2], samples.shape[-1],
+            model, cfg, rows, columns, overlap, overlap_x, overlap_y,
+            tile_batch_size, batch_images, grid_mode, sampling_mode,
+        )
+        out = latent.copy()
+        out.pop("batch_index", None)
+        out["samples"] = torch.cat(results, dim=0)
+        return (out, rows, columns)
+
+
+class VSLinx_MultiDiffusionTiledHiresFixStreaming(VSLinx_MultiDiffusionTiledHiresFix):
+    """The MultiDiffusion hires fix from an image file to an image file, for
+    images too large to hold as a float32 IMAGE tensor: the source is encoded
+    tile by tile into a memory-mapped latent on disk, and the result is
+    decoded tile by tile into the output file as it goes."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        types = super().INPUT_TYPES()
+        required = {
+            "image_path": ("STRING", {"default": "",
+                "tooltip": "Path of the (already-upscaled) source image file to refine. Binary .ppm and uncompressed .tif sources are memory-mapped and read one tile at a time; other formats are decoded once in RAM."}),
+            "output_path": ("STRING", {"default": "",
+                "tooltip": "Where to write the refined image. The format follows the extension; .ppm/.pnm are streamed strip by strip so RAM stays bounded, other formats (.png, .tif, ...) are assembled on disk and saved at the end."}),
+        }
+        required.update((k, v) for k, v in types["required"].items() if k not in _STREAM_REPLACED_INPUTS)
+        required["vae"] = ("VAE",)
+        required["vae_tile_size"] = ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32,
+            "tooltip": "Tile size in pixels for the streamed VAE encode and decode."})
+        required["work_dir"] = ("STRING", {"default": "",
+            "tooltip": "Folder for the memory-mapped latent and output scratch files (deleted afterwards). Empty = ComfyUI's temp folder."})
+        return {"required": required}
+
+    RETURN_TYPES = ("STRING", "INT", "INT")
+    RETURN_NAMES = ("output_path", "rows", "columns")
+    OUTPUT_NODE = True
+    DESCRIPTION = (
+        "File-to-file version of the MultiDiffusion Tiled Hires Fix for images "
+        "larger than RAM. Reads the source from a path, encodes it in tiles "
+        "into a memory-mapped latent on disk, refines it with seam-free tiled "
+        "sampling and decodes it tile by tile into the output file."
+    )
+    SEARCH_ALIASES = [
+        "hires fix streaming",
+        "hires fix file",
+        "multidiffusion streaming",
+        "poster upscale",
+        "gigapixel hires fix",
+    ]
+
+    def execute(self, image_path, output_path, model, positive, negative, vae,
+                seed, steps, cfg, sampler_name, scheduler, denoise,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size=1, grid_mode="manual",
+                sampling_mode="multidiffusion", freeze_threshold=0.0, freeze_refresh=4,
+                checkpoint_dir="", checkpoint_interval=5, offload_latent=False,
+                progressive_split=0.0, progressive_scale=0.5, progressive_upscale_method="bicubic",
+                late_overlap_scale=1.0, late_overlap_start=0.5,
+                vae_tile_size=512, work_dir=""):
+        import folder_paths
+
+        if not os.path.isfile(image_path):
+            raise FileNotFoundError(f"Source image '{image_path}' not found.")
+        if not output_path:
+            raise ValueError("output_path is empty.")
+        work_dir = work_dir or os.path.join(folder_paths.get_temp_directory(), "vslinx_md_stream")
+        os.makedirs(work_dir, exist_ok=True)
+        out_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(out_dir, exist_ok=True)
+        run_id = uuid.uuid4().hex[:12]
+        latent_path = os.path.join(work_dir, f"{run_id}_latent.npy")
+        pixels_path = os.path.join(work_dir, f"{run_id}_output.npy")
+
+        try:
+            # The source is read one encode window at a time.
+            read, h, w, im = _stream_open(image_path)
+            with im:
+                mapped = _stream_encode(vae, read, (h // 8) * 8, (w // 8) * 8,
+                                        vae_tile_size, latent_path)
+            del read
+            samples = torch.from_numpy(mapped)
+
+            def run(sl, rows, columns):
+                return self._run(
+                    {"samples": samples}, samples, model, positive, negative,
+                    seed, steps, cfg, sampler_name, scheduler, denoise,
+                    rows, columns, overlap, overlap_x, overlap_y,
+                    tile_batch_size, sampling_mode, freeze_threshold, freeze_refresh,
+                    checkpoint_dir, checkpoint_interval, offload_latent,
+                    progressive_split, progressive_scale, progressive_upscale_method,
+                    late_overlap_scale, late_overlap_start,
+                )["samples"]
+
+            rows, columns, results = self._refine(
+                run, 1, samples.shape[-2], samples.shape[-1],
+                model, cfg, rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, False, grid_mode, sampling_mode,
+            )
+            del samples, mapped
+            _stream_decode(vae, results[0], vae_tile_size, output_path, pixels_path)
+        finally:
+            for scratch in (latent_path, pixels_path):
+                try:
+                    os.remove(scratch)
+                except OSError:
+                    pass
+
+        logger.info("[vsLinx] MultiDiffusion streaming: wrote %s", output_path)
+        return (output_path, rows, columns)
 
 
 NODE_CLASS_MAPPINGS = {
     "vsLinx_MultiDiffusionTiledHiresFix": VSLinx_MultiDiffusionTiledHiresFix,
+    "vsLinx_MultiDiffusionTiledHiresFixLatent": VSLinx_MultiDiffusionTiledHiresFixLatent,
+    "vsLinx_MultiDiffusionTiledHiresFixStreaming": VSLinx_MultiDiffusionTiledHiresFixStreaming,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "vsLinx_MultiDiffusionTiledHiresFix": "MultiDiffusion Tiled Hires Fix",
+    "vsLinx_MultiDiffusionTiledHiresFixLatent": "MultiDiffusion Tiled Hires Fix (Latent)",
+    "vsLinx_MultiDiffusionTiledHiresFixStreaming": "MultiDiffusion Tiled Hires Fix (Streaming)",
 }
@@ -0,0 +1,308 @@
+"""
+vsLinx Tiled Sampler Planner
+
+Reports what a run of the tiled samplers (the Anima LLLite Tiled ControlNet
+Sampler and the MultiDiffusion Tiled Hires Fix) will cost *before* it is run:
+the tile geometry, the number of model evaluations, the tokens per model call,
+the overlap overhead and an estimate of the peak VRAM of the VAE encode, the
+sampling loop and the VAE decode. Optionally it times one calibration model
+call to turn the evaluation count into a wall-clock estimate.
+
+No sampling happens unless ``calibrate`` is on. The geometry comes from the
+samplers' own tiling helpers (``_tile_size`` / ``_md_grid`` / ``_md_auto_grid``)
+and the memory figures from ComfyUI's own estimates
+(``ModelPatcher.memory_required``, ``VAE.memory_used_encode/decode``), so the
+plan matches what the samplers will actually do.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+import torch
+
+from .anima_lllite_tiled_sampler import (
+    _md_auto_grid,
+    _md_grid,
+    _md_shifted_max_span,
+    _md_tile_groups,
+    _tile_size,
+)
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def _plan_tiles(mode, latent_h, latent_w, rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size):
+    """Tile rectangles (latent px, as ``(h, w)`` pairs) of one denoising step.
+
+    ``per_tile`` follows the essentials pixel grid (the tile is encoded and
+    sampled on its own), ``multidiffusion`` the latent grid of ``_md_grid`` and
+    ``spotdiffusion`` its nominal unshifted, non-overlapping grid (its real
+    tiles can be larger; see ``_md_shifted_max_span``).
+    """
+    if mode == "per_tile":
+        tile_h, tile_w, overlap_h, overlap_w = _tile_size(
+            latent_h * 8, latent_w * 8, rows, columns, overlap, overlap_x, overlap_y)
+        return [((tile_h + overlap_h) // 8, (tile_w + overlap_w) // 8)] * (rows * columns)
+    if mode == "spotdiffusion":
+        ys, xs = _md_grid(latent_h, latent_w, rows, columns, 0.0, 0, 0)
+    else:
+        ys, xs = _md_grid(latent_h, latent_w, rows, columns, overlap, overlap_x, overlap_y,
+                          uniform=tile_batch_size > 1)
+    return [(y1 - y0, x1 - x0) for y0, y1 in ys for x0, x1 in xs]
+
+
+def _tokens(model, tile_h, tile_w):
+    """Tokens the diffusion model sees for one ``tile_h`` x ``tile_w`` latent
+    tile: patchified transformers report ``patch_size``; for convolutional
+    models the latent pixel count is the closest equivalent."""
+    diffusion_model = getattr(model.model, "diffusion_model", None)
+    patch = getattr(diffusion_model, "patch_size", None)
+    if isinstance(patch, (tuple, list)):
+        ph, pw = int(patch[-2]), int(patch[-1])
+    elif isinstance(patch, int) and patch > 0:
+        ph = pw = patch
+    else:
+        return tile_h * tile_w, "latent px"
+    return -(-tile_h // ph) * -(-tile_w // pw), "tokens"
+
+
+def _calibrate(model, positive, negative, seed, cfg, sampler_name, scheduler,
+               batch, channels, tile_h, tile_w):
+    """Seconds of model calls in one sampling step on a ``batch`` of
+    ``tile_h`` x ``tile_w`` latent tiles. Only the calls themselves are timed
+    (through a model function wrapper), not the sampler setup or cond
+    processing around them. A first untimed run loads the model and warms up
+    the kernels, so the timed run is the steady-state cost."""
+    import comfy.model_management as mm
+    from nodes import common_ksampler
+
+    latent = {"samples": torch.zeros((batch, channels, tile_h, tile_w))}
+    device = mm.get_torch_device()
+    old_wrapper = model.model_options.get("model_function_wrapper")
+    timings = []
+
+    def sync():
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+
+    def wrapper(apply_model, args):
+        sync()
+        start = time.perf_counter()
+        if old_wrapper is not None:
+            out = old_wrapper(apply_model, args)
+        else:
+            out = apply_model(args["input"], args["timestep"], **args["c"])
+        sync()
+        timings.append(time.perf_counter() - start)
+        return out
+
+    m = model.clone()
+    m.set_model_unet_function_wrapper(wrapper)
+
+    def step():
+        common_ksampler(m, seed, 1, cfg, sampler_name, scheduler,
+                        positive, negative, latent, denoise=1.0)
+        mm.soft_empty_cache()
+
+    step()
+    timings.clear()
+    step()
+    return sum(timings)
+
+
+class VSLinx_TiledSamplerPlanner:
+    @classmethod
+    def INPUT_TYPES(cls):
+        # All comfy imports are lazy: this runs at runtime when comfy is loaded.
+        import comfy.samplers
+        from nodes import MAX_RESOLUTION
+
+        return {
+            "required": {
+                "model": ("MODEL",),
+                "sampling_mode": (["multidiffusion", "spotdiffusion", "per_tile"],
+                    {"tooltip": "The sampling_mode of the sampler being planned. The MultiDiffusion Tiled Hires Fix uses multidiffusion or spotdiffusion."}),
+                "width": ("INT", {"default": 2048, "min": 64, "max": MAX_RESOLUTION, "step": 8,
+                    "tooltip": "Image width in pixels. Ignored when an image is connected."}),
+                "height": ("INT", {"default": 2048, "min": 64, "max": MAX_RESOLUTION, "step": 8,
+                    "tooltip": "Image height in pixels. Ignored when an image is connected."}),
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": 4096,
+                    "tooltip": "Number of images. Ignored when an image is connected."}),
+
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "steps": ("INT", {"default": 20, "min": 1, "max": 10000}),
+                "cfg": ("FLOAT", {"default": 7.0, "min": 0.0, "max": 100.0, "step": 0.1, "round": 0.01}),
+                "sampler_name": (comfy.samplers.KSampler.SAMPLERS,),
+                "scheduler": (comfy.samplers.KSampler.SCHEDULERS,),
+
+                "rows": ("INT", {"default": 2, "min": 1, "max": 256, "step": 1}),
+                "columns": ("INT", {"default": 2, "min": 1, "max": 256, "step": 1}),
+                "overlap": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 0.5, "step": 0.01,
+                    "tooltip": "Overlap between tiles as a fraction of tile size, added on top of overlap_x/overlap_y."}),
+                "overlap_x": ("INT", {"default": 64, "min": 0, "max": MAX_RESOLUTION // 2, "step": 1,
+                    "tooltip": "Extra horizontal overlap in pixels."}),
+                "overlap_y": ("INT", {"default": 64, "min": 0, "max": MAX_RESOLUTION // 2, "step": 1,
+                    "tooltip": "Extra vertical overlap in pixels."}),
+                "tile_batch_size": ("INT", {"default": 1, "min": 1, "max": 256, "step": 1,
+                    "tooltip": "Tiles per model call, as set on the sampler."}),
+                "grid_mode": (["manual", "auto"], {"default": "manual",
+                    "tooltip": "auto: plan the grid the tiled samplers would pick for the current free VRAM, instead of rows/columns."}),
+
+                "vae_encode_tiled": ("BOOLEAN", {"default": False}),
+                "vae_encode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32}),
+                "vae_decode_tiled": ("BOOLEAN", {"default": False}),
+                "vae_decode_tile_size": ("INT", {"default": 512, "min": 64, "max": 4096, "step": 32}),
+
+                "calibrate": ("BOOLEAN", {"default": False,
+                    "tooltip": "Time the model calls of one sampling step on a real tile batch (needs positive and negative) and extrapolate the sampling time. Loads the model; off = pure arithmetic, no model call."}),
+            },
+            "optional": {
+                "image": ("IMAGE", {"tooltip": "Optional: plan for this image's size and batch instead of width/height/batch_size."}),
+                "vae": ("VAE", {"tooltip": "Optional: needed for the VAE encode/decode VRAM estimates."}),
+                "positive": ("CONDITIONING",),
+                "negative": ("CONDITIONING",),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "INT", "FLOAT", "FLOAT")
+    RETURN_NAMES = ("report", "model_evaluations", "peak_vram_mb", "estimated_seconds")
+    FUNCTION = "execute"
+    CATEGORY = "vsLinx/sampling"
+    OUTPUT_NODE = True
+    DESCRIPTION = (
+        "Plans a tiled sampler run without sampling: tile geometry, model evaluations "
+        "(tiles x steps x CFG), tokens per model call, overlap overhead and estimated "
+        "peak VRAM for the VAE encode, sampling and VAE decode. Optionally times one "
+        "calibration step to estimate the sampling time."
+    )
+    SEARCH_ALIASES = ["tiled planner", "multidiffusion estimate", "tile cost", "vram estimate", "hires fix planner"]
+
+    def execute(self, model, sampling_mode, width, height, batch_size,
+                seed, steps, cfg, sampler_name, scheduler,
+                rows, columns, overlap, overlap_x, overlap_y,
+                tile_batch_size, grid_mode,
+                vae_encode_tiled, vae_encode_tile_size,
+                vae_decode_tiled, vae_decode_tile_size,
+                calibrate, image=None, vae=None, positive=None, negative=None):
+        if image is not None:
+            batch_size, height, width = image.shape[0], image.shape[1], image.shape[2]
+        latent_h, latent_w = height // 8, width // 8
+        channels = int(model.model.latent_format.latent_channels)
+        # cond + uncond share a call unless cfg is 1 (uncond is skipped).
+        cfg_mult = 1 if cfg == 1.0 else 2
+        lines = []
+
+        if grid_mode == "auto":
+            # Same call as the samplers: every mode resolves the auto grid.
+            rows, columns, _, _, fits = _md_auto_grid(
+                model, latent_h, latent_w, overlap, overlap_x, overlap_y,
+                cfg_mult * tile_batch_size,
+                uniform=sampling_mode != "per_tile" and tile_batch_size > 1,
+                shifted=sampling_mode == "spotdiffusion",
+            )
+            if not fits:
+                lines.append("Warning: no grid fits the free VRAM; planning the finest allowed grid.")
+
+        tiles = _plan_tiles(sampling_mode, latent_h, latent_w, rows, columns,
+                            overlap, overlap_x, overlap_y, tile_batch_size)
+        tile_h = max(h for h, _ in tiles)
+        tile_w = max(w for _, w in tiles)
+        if sampling_mode == "spotdiffusion":
+            # The moving grid merges edge slivers: size for its largest tile.
+            tile_h = _md_shifted_max_span(latent_h, rows)
+            tile_w = _md_shifted_max_span(latent_w, columns)
+        tiled_area = sum(h * w for h, w in tiles)
+        overhead = tiled_area / float(latent_h * latent_w) - 1.0
+
+        if sampling_mode == "per_tile":
+            # tile_batch_size tiles share each sampler run
+            call_batch = cfg_mult * min(tile_batch_size, len(tiles))
+            calls_per_step = -(-len(tiles) // tile_batch_size)
+        else:
+            groups = _md_tile_groups([{"y0": 0, "y1": h, "x0": 0, "x1": w} for h, w in tiles],
+                                     tile_batch_size)
+            call_batch = cfg_mult * max(len(g) for g in groups)
+            calls_per_step = len(groups)
+        evaluations = batch_size * len(tiles) * steps * cfg_mult
+        model_calls = batch_size * calls_per_step * steps
+        tokens, token_unit = _tokens(model, tile_h, tile_w)
+
+        # --- memory -------------------------------------------------------
+        weights = model.model_size()
+        activations = model.memory_required((call_batch, channels, tile_h, tile_w))
+        # the sampler's own full-latent buffers (x, denoised, noise, accumulator)
+        latent_buffers = 0
+        if sampling_mode != "per_tile":
+            latent_buffers = 4 * batch_size * channels * latent_h * latent_w * 4
+        sampling_peak = weights + activations + latent_buffers
+
+        encode_peak = decode_peak = 0
+        if vae is not None:
+            patcher = getattr(vae, "patcher", None)
+            vae_weights = patcher.model_size() if patcher is not None else 0
+            if sampling_mode == "per_tile":
+                k = call_batch // cfg_mult
+                enc_shape = (k, 3, tile_h * 8, tile_w * 8)
+                dec_shape = (k, channels, tile_h, tile_w)
+            else:
+                enc_shape = ((1, 3, vae_encode_tile_size, vae_encode_tile_size) if vae_encode_tiled
+                             else (1, 3, height, width))
+                dec_shape = ((1, channels, vae_decode_tile_size // 8, vae_decode_tile_size // 8)
+                             if vae_decode_tiled else (1, channels, latent_h, latent_w))
+            encode_peak = vae_weights + vae.memory_used_encode(enc_shape, vae.vae_dtype)
+            decode_peak = vae_weights + vae.memory_used_decode(dec_shape, vae.vae_dtype)
+        peak = max(encode_peak, sampling_peak, decode_peak)
+
+        # --- optional timing ----------------------------------------------
+        estimated_seconds = 0.0
+        seconds_per_call = None
+        if calibrate:
+            if positive is None or negative is None:
+                lines.append("Calibration skipped: connect positive and negative.")
+            else:
+                seconds_per_call = _calibrate(model, positive, negative, seed, cfg,
+                                              sampler_name, scheduler, call_batch // cfg_mult,
+                                              channels, tile_h, tile_w)
+                estimated_seconds = seconds_per_call * model_calls
+
+        lines[:0] = [
+            f"Mode: {sampling_mode}, {rows} x {columns} grid ({grid_mode}) on "
+            f"{batch_size} x {width}x{height} px ({latent_w}x{latent_h} latent)",
+            f"Tiles: {len(tiles)}, up to {tile_w * 8}x{tile_h * 8} px ({tile_w}x{tile_h} latent)",
+            f"Overlap overhead: {overhead * 100.0:.1f}% extra latent area per step",
+            f"Model evaluations: {batch_size} image(s) x {len(tiles)} tiles x {steps} steps "
+            f"x {cfg_mult} (cfg) = {evaluations}",
+            f"Model calls: {calls_per_step} per step x {steps} steps x {batch_size} image(s) "
+            f"= {model_calls}, batch {call_batch}",
+            f"Per call: {tokens} {token_unit} per tile, {tokens * call_batch} per call",
+            f"Peak VRAM (estimate): sampling {sampling_peak / _MB:.0f} MB "
+            f"(weights {weights / _MB:.0f} + activations {activations / _MB:.0f} "
+            f"+ latents {latent_buffers / _MB:.0f})",
+        ]
+        if vae is not None:
+            lines.append(f"Peak VRAM (estimate): encode {encode_peak / _MB:.0f} MB, "
+                         f"decode {decode_peak / _MB:.0f} MB")
+        else:
+            lines.append("VAE encode/decode: connect a vae for their estimates.")
+        lines.append(f"Peak VRAM (estimate): {peak / _MB:.0f} MB overall")
+        if seconds_per_call is not None:
+            lines.append(f"Calibration: {seconds_per_call:.3f} s per call -> "
+                         f"~{estimated_seconds:.1f} s of sampling (VAE not included)")
+
+        report = "\n".join(lines)
+        logger.info("[vsLinx] Tiled sampler plan:\n%s", report)
+        return (report, evaluations, peak / _MB, estimated_seconds)
+
+
+NODE_CLASS_MAPPINGS = {
+    "vsLinx_TiledSamplerPlanner": VSLinx_TiledSamplerPlanner,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "vsLinx_TiledSamplerPlanner": "Tiled Sampler Planner",
+}
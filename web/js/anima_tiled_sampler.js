@@ -1,13 +1,27 @@
 import { app } from "../../../scripts/app.js";
 
-// Anima LLLite Tiled ControlNet Sampler: the tiled-VAE-decode widgets only
-// apply in multidiffusion mode (per_tile decodes each small tile on its own),
-// so hide them unless sampling_mode === "multidiffusion".
+// Anima LLLite Tiled ControlNet Sampler: the tiled-VAE encode/decode widgets only apply
+// to the whole-latent modes (multidiffusion/spotdiffusion; per_tile encodes and decodes
+// each small tile on its own), so hide them while sampling_mode === "per_tile" - unless
+// per_tile_vae encodes (and decodes) the full image once. Tile freezing needs tiles that
+// stay put between steps, so it only shows in multidiffusion (spotdiffusion shifts the
+// grid every step). per_tile_vae itself only shows in per_tile mode.
 
 const NODE_CLASS = "vsLinx_AnimaLLLiteTiledSampler";
 const MODE_WIDGET = "sampling_mode";
+const PER_TILE_VAE_WIDGET = "per_tile_vae";
+const PER_TILE = "per_tile";
 const MULTIDIFFUSION = "multidiffusion";
-const TILED_WIDGETS = ["vae_decode_tiled", "vae_decode_tile_size"];
+// widget name -> (sampling_mode, per_tile_vae) => visible
+const WIDGET_RULES = {
+  vae_decode_tiled: (mode, vae) => mode !== PER_TILE || vae === "encode_decode_once",
+  vae_decode_tile_size: (mode, vae) => mode !== PER_TILE || vae === "encode_decode_once",
+  freeze_threshold: (mode) => mode === MULTIDIFFUSION,
+  freeze_refresh: (mode) => mode === MULTIDIFFUSION,
+  vae_encode_tiled: (mode, vae) => mode !== PER_TILE || vae !== PER_TILE,
+  vae_encode_tile_size: (mode, vae) => mode !== PER_TILE || vae !== PER_TILE,
+  per_tile_vae: (mode) => mode === PER_TILE,
+};
 const HIDDEN_TYPE = "vslinxhidden";
 
 const findWidget = (node, name) => node.widgets?.find((w) => w.name === name);
@@ -30,10 +44,12 @@ const showWidget = (w) => {
 };
 
 const updateVisibility = (node) => {
-  const show = findWidget(node, MODE_WIDGET)?.value === MULTIDIFFUSION;
-  for (const name of TILED_WIDGETS) {
+  const mode = findWidget(node, MODE_WIDGET)?.value;
+  if (mode === undefined) return;
+  const vae = findWidget(node, PER_TILE_VAE_WIDGET)?.value ?? PER_TILE;
+  for (const [name, visible] of Object.entries(WIDGET_RULES)) {
     const w = findWidget(node, name);
-    show ? showWidget(w) : hideWidget(w);
+    visible(mode, vae) ? showWidget(w) : hideWidget(w);
   }
   // Recompute height (keep the user's width) so the node shrinks/grows to fit.
   node.setSize([node.size[0], node.computeSize()[1]]);
@@ -49,10 +65,11 @@ app.registerExtension({
     nodeType.prototype.onNodeCreated = function () {
       const r = onNodeCreated?.apply(this, arguments);
       const node = this;
-      const mode = findWidget(node, MODE_WIDGET);
-      if (mode) {
-        const origCallback = mode.callback;
-        mode.callback = function () {
+      for (const name of [MODE_WIDGET, PER_TILE_VAE_WIDGET]) {
+        const w = findWidget(node, name);
+        if (!w) continue;
+        const origCallback = w.callback;
+        w.callback = function () {
           const ret = origCallback?.apply(this, arguments);
           updateVisibility(node);
           return ret;